@@ -0,0 +1,75 @@
+"""Compare QueryResponse parsing against the previous per-row implementation.
+
+Run with: python benchmarks/query_response.py [rows]
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Any, ClassVar
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from fibery import FiberyBaseModel, QueryResponse
+
+
+class Task(FiberyBaseModel):
+    name: str
+    state: str
+    estimate: float | None = None
+    assignee: dict[str, Any] | None = None
+
+    FIBERY_FIELD_MAP: ClassVar[dict[str, str]] = {
+        'name': 'Tasks/Name',
+        'state': 'workflow/state',
+        'estimate': 'Tasks/Estimate',
+        'assignee': 'Tasks/Assignee',
+    }
+
+
+def legacy_parse(data: list[dict[str, Any]], model_class: type[Task]) -> list[Task]:
+    items = []
+    for row in data:
+        reverse_map = {
+            fibery_field: field_name
+            for field_name, fibery_field in model_class.FIBERY_FIELD_MAP.items()
+        }
+        transformed = {}
+        for fibery_field, value in row.items():
+            if fibery_field in reverse_map:
+                transformed[reverse_map[fibery_field]] = value
+        items.append(model_class.model_validate(transformed))
+    return items
+
+
+def measure(label: str, parse: Any, rows: list[dict[str, Any]], repeat: int = 3) -> float:
+    best = min(_timed(parse, rows) for _ in range(repeat))
+    print(f'{label:<10} {best * 1000:8.1f} ms  {len(rows) / best:12,.0f} rows/s')
+    return best
+
+
+def _timed(parse: Any, rows: list[dict[str, Any]]) -> float:
+    started = time.perf_counter()
+    parse(rows)
+    return time.perf_counter() - started
+
+
+def main(count: int) -> None:
+    rows = [
+        {
+            'fibery/id': f'00000000-0000-0000-0000-{index:012d}',
+            'Tasks/Name': f'Task {index}',
+            'workflow/state': 'Open',
+            'Tasks/Estimate': index / 10,
+            'Tasks/Assignee': {'fibery/id': 'user'},
+        }
+        for index in range(count)
+    ]
+
+    print(f'Parsing {count:,} rows')
+    legacy = measure('legacy', lambda data: legacy_parse(data, Task), rows)
+    current = measure('current', lambda data: QueryResponse(data, Task), rows)
+    print(f'speedup    {legacy / current:8.2f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
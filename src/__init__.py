@@ -43,27 +43,52 @@ Basic Usage:
 For more information, visit: https://github.com/aithenaltd/fibery-client
 """
 
+from fibery.cache import CacheBackend, TTLCache
+from fibery.dispatcher import CommandDispatcher
 from fibery.entity_model import FiberyBaseModel
 from fibery.fibery_models import (
     DocumentResponse,
+    DownloadResult,
+    EntityCommandResult,
     FiberyError,
     FiberyResponse,
     FiberyUploadError,
+    FileAttachResult,
     QueryResponse,
+    UploadResult,
+    UploadSummary,
 )
 from fibery.fibery_service import FiberyService
-from fibery.utils import DocumentFormat
+from fibery.rate_limiter import RateLimiter
+from fibery.retry import CommandKind, RetryPolicy
+from fibery.upload_index import UploadIndex
+from fibery.utils import Aggregate, DocumentFormat, PaginationMode, ResultMode
 
 __version__ = "0.1.0"
 __author__ = "Aithena"
 
 __all__ = [
+    "Aggregate",
+    "CacheBackend",
+    "CommandDispatcher",
+    "CommandKind",
     "DocumentFormat",
     "DocumentResponse",
+    "DownloadResult",
+    "EntityCommandResult",
     "FiberyBaseModel",
     "FiberyError",
     "FiberyResponse",
     "FiberyService",
     "FiberyUploadError",
+    "FileAttachResult",
+    "PaginationMode",
     "QueryResponse",
+    "RateLimiter",
+    "ResultMode",
+    "RetryPolicy",
+    "TTLCache",
+    "UploadIndex",
+    "UploadResult",
+    "UploadSummary",
 ]
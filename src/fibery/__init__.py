@@ -1,23 +1,48 @@
+from .cache import CacheBackend, TTLCache
+from .dispatcher import CommandDispatcher
 from .entity_model import FiberyBaseModel
 from .fibery_models import (
     DocumentResponse,
+    DownloadResult,
+    EntityCommandResult,
     FiberyError,
     FiberyResponse,
     FiberyUploadError,
+    FileAttachResult,
     QueryResponse,
+    UploadResult,
+    UploadSummary,
 )
 from .fibery_service import FiberyService
-from .utils import DocumentFormat
+from .rate_limiter import RateLimiter
+from .retry import CommandKind, RetryPolicy
+from .upload_index import UploadIndex
+from .utils import Aggregate, DocumentFormat, PaginationMode, ResultMode
 
 __version__ = "0.1.0"
 
 __all__ = [
+    "Aggregate",
+    "CacheBackend",
+    "CommandDispatcher",
+    "CommandKind",
     "DocumentFormat",
     "DocumentResponse",
+    "DownloadResult",
+    "EntityCommandResult",
     "FiberyBaseModel",
     "FiberyError",
     "FiberyResponse",
     "FiberyService",
     "FiberyUploadError",
+    "FileAttachResult",
+    "PaginationMode",
     "QueryResponse",
+    "RateLimiter",
+    "ResultMode",
+    "RetryPolicy",
+    "TTLCache",
+    "UploadIndex",
+    "UploadResult",
+    "UploadSummary",
 ]
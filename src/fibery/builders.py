@@ -3,11 +3,35 @@ from typing import Any
 from uuid import uuid4
 
 from .entity_model import FiberyBaseModel
-from .fibery_models import FiberyCommand
-from .utils import CollectionOperation
+from .fibery_models import FiberyCommand, relation_models
+from .utils import Aggregate, CollectionOperation
+
+KEYSET_FIELDS = ('fibery/creation-date', 'fibery/id')
+KEYSET_ORDER_BY = [[[field], 'q/asc'] for field in KEYSET_FIELDS]
+
+
+def _model_select(
+    model_class: type[FiberyBaseModel],
+    parents: tuple[type[FiberyBaseModel], ...],
+) -> list[str | dict[str, Any]]:
+    select: list[str | dict[str, Any]] = list(model_class.FIBERY_FIELD_MAP.values())
+    parents = (*parents, model_class)
+    for fibery_field, (related_class, is_collection) in relation_models(model_class).items():
+        # A relation back to a model already being selected would recurse forever
+        if related_class in parents:
+            continue
+        subquery: dict[str, Any] = {'q/select': _model_select(related_class, parents)}
+        if is_collection:
+            subquery['q/limit'] = 'q/no-limit'
+        select.append({fibery_field: subquery})
+    return select
 
 
 class QueryBuilder:
+    @staticmethod
+    def build_select(model_class: type[FiberyBaseModel]) -> list[str | dict[str, Any]]:
+        return _model_select(model_class, ())
+
     @staticmethod
     def build_document_query(type_name: str, entity_id: str, field_name: str) -> dict[str, Any]:
         return {
@@ -26,6 +50,24 @@ class QueryBuilder:
             }
         }
 
+    @staticmethod
+    def build_documents_query(
+        type_name: str,
+        entity_ids: Sequence[str],
+        field_names: Sequence[str]
+    ) -> dict[str, Any]:
+        fields: list[str | dict[str, Any]] = [
+            'fibery/id',
+            *({field_name: ['Collaboration~Documents/secret']} for field_name in field_names)
+        ]
+        return QueryBuilder.build_in_query(
+            type_name=type_name,
+            fields=fields,
+            field_name='fibery/id',
+            values=entity_ids,
+            limit=len(entity_ids)
+        )
+
     @staticmethod
     def build_entities_query(
         type_name: str,
@@ -61,10 +103,56 @@ class QueryBuilder:
 
         return command
 
+    @staticmethod
+    def build_aggregate_query(
+        type_name: str,
+        aggregates: dict[str, tuple[Aggregate | str, str | list[str]]],
+        group_by: dict[str, str | list[str]] | None = None,
+        where: list[Any] | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        select: dict[str, Any] = dict(group_by or {})
+        select.update({alias: [str(aggregate), field] for alias, (aggregate, field) in aggregates.items()})
+        query: dict[str, Any] = {
+            'q/from': type_name,
+            'q/select': select,
+            'q/limit': 'q/no-limit'
+        }
+
+        if group_by:
+            query['q/group-by'] = list(group_by.values())
+        if where is not None:
+            query['q/where'] = where
+
+        command: dict[str, Any] = {
+            'command': 'fibery.entity/query',
+            'args': {
+                'query': query
+            }
+        }
+
+        if params is not None:
+            command['args']['params'] = params
+
+        return command
+
+    @staticmethod
+    def build_count_query(
+        type_name: str,
+        where: list[Any] | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        return QueryBuilder.build_aggregate_query(
+            type_name=type_name,
+            aggregates={'count': (Aggregate.COUNT, 'fibery/id')},
+            where=where,
+            params=params
+        )
+
     @staticmethod
     def build_filtered_query(
         type_name: str,
-        fields: Sequence[str],
+        fields: Sequence[str | dict[str, Any]],
         field_name: str,
         operator: str,
         value: Any,
@@ -78,10 +166,58 @@ class QueryBuilder:
             params={'$value': value}
         )
 
+    @staticmethod
+    def build_keyset_query(
+        type_name: str,
+        fields: Sequence[str | dict[str, Any]],
+        page_size: int,
+        cursor: tuple[Any, str] | None = None,
+        where: list[Any] | None = None,
+        params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        select = list(fields) + [field for field in KEYSET_FIELDS if field not in fields]
+        if cursor is not None:
+            after_cursor = [
+                'or',
+                ['>', ['fibery/creation-date'], '$cursor_date'],
+                [
+                    'and',
+                    ['=', ['fibery/creation-date'], '$cursor_date'],
+                    ['>', ['fibery/id'], '$cursor_id']
+                ]
+            ]
+            where = after_cursor if where is None else ['and', where, after_cursor]
+            params = {**(params or {}), '$cursor_date': cursor[0], '$cursor_id': cursor[1]}
+
+        return QueryBuilder.build_entities_query(
+            type_name=type_name,
+            fields=select,
+            where=where,
+            order_by=KEYSET_ORDER_BY,
+            limit=page_size,
+            params=params
+        )
+
+    @staticmethod
+    def build_in_query(
+        type_name: str,
+        fields: Sequence[str | dict[str, Any]],
+        field_name: str,
+        values: Sequence[Any],
+        limit: int | str = 'q/no-limit'
+    ) -> dict[str, Any]:
+        return QueryBuilder.build_entities_query(
+            type_name=type_name,
+            fields=fields,
+            where=['q/in', [field_name], '$values'],
+            limit=limit,
+            params={'$values': list(values)}
+        )
+
     @staticmethod
     def build_date_range_query(
         type_name: str,
-        fields: Sequence[str],
+        fields: Sequence[str | dict[str, Any]],
         date_field: str,
         start_date: str | Any,
         end_date: str | Any,
@@ -133,6 +269,14 @@ class EntityBuilder:
             }
         )
 
+    @staticmethod
+    def diff_updates(updates: dict[str, Any], previous: dict[str, Any]) -> dict[str, Any]:
+        return {
+            field: value
+            for field, value in updates.items()
+            if field not in previous or previous[field] != value
+        }
+
     @staticmethod
     def prepare_collection_command(
             type_name: str,
@@ -0,0 +1,105 @@
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, Protocol, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+READ_COMMANDS = frozenset({'fibery.entity/query', 'fibery.schema/query'})
+
+# Marks queries whose nested selects read types other than q/from
+ANY_TYPE = '*'
+
+QueryCacheKey = tuple[frozenset[str], str, type, str]
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(
+            self,
+            maxsize: int = 1024,
+            ttl: float | None = None,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f'Cache size must be at least 1, got {maxsize}')
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f'TTL must be positive or None, got {ttl}')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        expires_at = self._clock() + self.ttl if self.ttl is not None else float('inf')
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def discard_if(self, predicate: Callable[[K], bool]) -> int:
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: Any) -> Any: ...
+
+    def set(self, key: Any, value: Any) -> None: ...
+
+    def discard_if(self, predicate: Callable[[Any], bool]) -> int: ...
+
+
+def query_cache_key(query: dict[str, Any], model_class: type, result_mode: str) -> QueryCacheKey:
+    spec = query['args']['query']
+    # A nested select names the relation field, not the related type, so any write may change it
+    nested = any(isinstance(field, dict) for field in spec.get('q/select', []))
+    type_names = frozenset({spec['q/from'], ANY_TYPE} if nested else {spec['q/from']})
+    return type_names, json.dumps(query, sort_keys=True, default=str), model_class, str(result_mode)
+
+
+def reads_any(key: QueryCacheKey, type_names: set[str]) -> bool:
+    return ANY_TYPE in key[0] or not key[0].isdisjoint(type_names)
@@ -17,7 +17,7 @@ class FiberyConfig:
             raise ValueError('FIBERY_TOKEN and FIBERY_ACCOUNT must be set in .env file or passed as arguments')
 
         self.base_url = f'https://{self.account}.fibery.io'
+        # httpx sets Content-Type from the body, so multipart uploads can share the client
         self.headers = {
             'Authorization': f'Token {self.token}',
-            'Content-Type': 'application/json'
         }
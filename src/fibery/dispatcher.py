@@ -0,0 +1,83 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .fibery_models import FiberyError
+
+
+class CommandDispatcher:
+    """Collects commands issued by concurrent tasks and sends them as one /api/commands array."""
+
+    def __init__(
+            self,
+            send: Callable[[list[dict[str, Any]]], Awaitable[Any]],
+            window: float = 0.005,
+            max_batch_size: int = 50,
+    ) -> None:
+        if window < 0:
+            raise ValueError(f'Batch window must not be negative, got {window}')
+        if max_batch_size < 1:
+            raise ValueError(f'Batch size must be at least 1, got {max_batch_size}')
+
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches_sent = 0
+        self.commands_sent = 0
+        self._send_commands = send
+        self._pending: list[tuple[dict[str, Any], asyncio.Future[Any]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, command: dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.append((command, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def flush(self) -> None:
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[dict[str, Any], asyncio.Future[Any]]]) -> None:
+        self.batches_sent += 1
+        self.commands_sent += len(batch)
+        try:
+            result = await self._send_commands([command for command, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as error:
+            self._fail(batch, error)
+            return
+
+        if not isinstance(result, list) or len(result) != len(batch):
+            self._fail(batch, FiberyError(f'Unexpected response for a batch of {len(batch)} commands: {result}'))
+            return
+
+        for (_, future), item in zip(batch, result, strict=True):
+            if not future.done():
+                future.set_result(item)
+
+    @staticmethod
+    def _fail(batch: list[tuple[dict[str, Any], asyncio.Future[Any]]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
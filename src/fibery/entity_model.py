@@ -1,20 +1,36 @@
-from typing import Any, ClassVar
+import types
+from collections.abc import Sequence
+from typing import Annotated, Any, ClassVar, Union, get_args, get_origin
 
-from pydantic import BaseModel
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field
 
 from .utils import DocumentFormat
 
 
+def _is_collection(annotation: Any) -> bool:
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        return any(_is_collection(argument) for argument in get_args(annotation))
+    return origin in (list, tuple, set, frozenset, Sequence)
+
+
+def _empty_if_none(value: Any) -> Any:
+    return [] if value is None else value
+
+
 class RichTextField(BaseModel):
     content: str
     format: DocumentFormat = DocumentFormat.MARKDOWN
 
 
 class FiberyBaseModel(BaseModel):
-    fibery_id: str | None = None
+    model_config = ConfigDict(populate_by_name=True)
+
+    fibery_id: str | None = Field(default=None, validation_alias='fibery/id')
 
     FIBERY_FIELD_MAP: ClassVar[dict[str, str]] = {}
     RICH_TEXT_FIELDS: ClassVar[dict[str, str]] = {}
+    FIBERY_RELATIONS: ClassVar[dict[str, str]] = {}
 
     def __init_subclass__(cls, **kwargs: Any) -> None:
         super().__init_subclass__(**kwargs)
@@ -22,6 +38,15 @@ class FiberyBaseModel(BaseModel):
             'fibery_id': 'fibery/id',
             **cls.FIBERY_FIELD_MAP
         }
+        # Runs before pydantic collects the fields, so raw Fibery rows validate without remapping
+        annotations = cls.__dict__.get('__annotations__', {})
+        for field_name, fibery_field in {**cls.FIBERY_FIELD_MAP, **cls.FIBERY_RELATIONS}.items():
+            if field_name not in annotations:
+                continue
+            metadata: list[Any] = [Field(validation_alias=fibery_field)]
+            if field_name in cls.FIBERY_RELATIONS and _is_collection(annotations[field_name]):
+                metadata.append(BeforeValidator(_empty_if_none))
+            annotations[field_name] = Annotated[annotations[field_name], *metadata]
 
     def to_fibery_fields(self) -> dict[str, Any]:
         return {
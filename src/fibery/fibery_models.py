@@ -1,9 +1,13 @@
+import types
+from collections.abc import Iterable, Sequence
 from enum import Enum
-from typing import Any, Generic, TypeVar
+from functools import cache
+from typing import Any, Generic, TypeVar, Union, cast, get_args, get_origin, overload
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from .entity_model import FiberyBaseModel
+from .utils import ResultMode
 
 T = TypeVar('T', bound=FiberyBaseModel)
 
@@ -33,12 +37,73 @@ class DocumentResponse(BaseModel):
         doc = cls(field_content=DocumentSecret.model_validate(field_data))
         return doc.field_content.secret if doc.field_content else None
 
+    @classmethod
+    def secrets_from_raw_response(
+            cls,
+            response: dict[str, Any],
+            field_names: Sequence[str]
+    ) -> dict[str, dict[str, str]]:
+        if not response.get('success') or not response.get('result'):
+            return {}
+
+        secrets: dict[str, dict[str, str]] = {}
+        for row in response['result']:
+            for field_name in field_names:
+                field_data = row.get(field_name)
+                if field_data:
+                    secrets.setdefault(row['fibery/id'], {})[field_name] = DocumentSecret.model_validate(field_data).secret
+        return secrets
+
 
 class FiberyCommand(BaseModel):
     command: str
     args: dict[str, Any]
 
 
+class EntityCommandResult(BaseModel):
+    entity_id: str
+    success: bool
+    result: Any = None
+    error: str | None = None
+    document_errors: dict[str, str] = {}
+    skipped: bool = False
+
+    @classmethod
+    def from_raw_response(
+            cls,
+            entity_id: str,
+            response: dict[str, Any] | None,
+    ) -> 'EntityCommandResult':
+        if response is None:
+            return cls(entity_id=entity_id, success=False, error='No result returned for command')
+
+        success = bool(response.get('success'))
+        result = response.get('result')
+        return cls(
+            entity_id=entity_id,
+            success=success,
+            result=result,
+            error=None if success else str(result),
+        )
+
+    @classmethod
+    def from_raw_responses(
+            cls,
+            entity_ids: Sequence[str],
+            response: Any,
+    ) -> list['EntityCommandResult']:
+        if not isinstance(response, list):
+            return [
+                cls(entity_id=entity_id, success=False, error=f'Unexpected response: {response}')
+                for entity_id in entity_ids
+            ]
+
+        return [
+            cls.from_raw_response(entity_id, response[index] if index < len(response) else None)
+            for index, entity_id in enumerate(entity_ids)
+        ]
+
+
 class FiberyError(Exception):
     pass
 
@@ -62,6 +127,26 @@ class FileUploadResponse(BaseModel):
     secret: str = Field(..., alias='fibery/secret')
 
 
+class DownloadResult(BaseModel):
+    secret: str
+    path: str
+    success: bool
+    size: int = 0
+    sha256: str | None = None
+    resumed: int = 0
+    error: str | None = None
+    duration: float = 0.0
+
+
+class FileAttachResult(BaseModel):
+    index: int
+    path: str
+    success: bool
+    file: FileUploadResponse | None = None
+    error: str | None = None
+    duration: float = 0.0
+
+
 class HttpMethod(str, Enum):
     GET = 'GET'
     POST = 'POST'
@@ -72,49 +157,183 @@ class HttpMethod(str, Enum):
         return self.value
 
 
+@cache
+def reverse_field_map(model_class: type[FiberyBaseModel]) -> dict[str, str]:
+    return {
+        fibery_field: field_name
+        for field_name, fibery_field in {**model_class.FIBERY_FIELD_MAP, **model_class.FIBERY_RELATIONS}.items()
+    }
+
+
+def _relation_target(annotation: Any) -> tuple[type[FiberyBaseModel] | None, bool]:
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        for argument in get_args(annotation):
+            candidate = _relation_target(argument)
+            if candidate[0] is not None:
+                return candidate
+        return None, False
+    if origin in (list, tuple, set, frozenset, Sequence):
+        target, _ = _relation_target(get_args(annotation)[0])
+        return target, True
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel) and hasattr(annotation, 'FIBERY_FIELD_MAP'):
+        return cast('type[FiberyBaseModel]', annotation), False
+    return None, False
+
+
+@cache
+def relation_models(model_class: type[FiberyBaseModel]) -> dict[str, tuple[type[FiberyBaseModel], bool]]:
+    relations: dict[str, tuple[type[FiberyBaseModel], bool]] = {}
+    for field_name, fibery_field in model_class.FIBERY_RELATIONS.items():
+        target, is_collection = _relation_target(model_class.model_fields[field_name].annotation)
+        if target is None:
+            raise TypeError(
+                f'Relation {field_name} of {model_class.__name__} must be annotated with a FiberyBaseModel subclass'
+            )
+        relations[fibery_field] = (target, is_collection)
+    return relations
+
+
+@cache
+def list_adapter(model_class: type[FiberyBaseModel]) -> TypeAdapter[list[Any]]:
+    return TypeAdapter(list[model_class])  # type: ignore[valid-type]
+
+
+class LazyItems(Sequence[T]):
+    def __init__(self, rows: list[dict[str, Any]], model_class: type[T]) -> None:
+        self._rows = rows
+        self._model_class = model_class
+        self._items: list[T | None] = [None] * len(rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._model_class.model_validate(self._rows[index])
+        return item
+
+
 class QueryResponse(Generic[T]):
     def __init__(
             self,
-            data: list[dict[str, Any]],
+            data: Iterable[dict[str, Any]],
             model_class: type[T],
+            mode: ResultMode = ResultMode.VALIDATE,
     ) -> None:
-        transformed_data = [
-            self._transform_fibery_fields(item, model_class)
+        self.mode = mode
+        self.rows: list[dict[str, Any]] = []
+        self.items: Sequence[T]
+        if mode == ResultMode.VALIDATE:
+            self.items = self.parse_items(data, model_class)
+        else:
+            self._set_rows(self.map_rows(data, model_class), model_class)
+        self.total: int = len(self.items)
+
+    def _set_rows(self, rows: list[dict[str, Any]], model_class: type[T]) -> None:
+        if self.mode == ResultMode.TRUSTED:
+            self.items = [self.construct_item(row, model_class) for row in rows]
+        elif self.mode == ResultMode.LAZY:
+            self.rows = rows
+            self.items = LazyItems(rows, model_class)
+        else:
+            self.rows = rows
+            self.items = cast('Sequence[T]', rows)
+
+    @staticmethod
+    def map_rows(data: Iterable[dict[str, Any]], model_class: type[FiberyBaseModel]) -> list[dict[str, Any]]:
+        reverse_map = reverse_field_map(model_class)
+        relations = relation_models(model_class)
+        if not relations:
+            return [
+                {reverse_map[fibery_field]: value for fibery_field, value in item.items() if fibery_field in reverse_map}
+                for item in data
+            ]
+
+        return [
+            {
+                reverse_map[fibery_field]: (
+                    QueryResponse.map_relation(value, *relations[fibery_field])
+                    if fibery_field in relations else value
+                )
+                for fibery_field, value in item.items()
+                if fibery_field in reverse_map
+            }
             for item in data
         ]
 
-        self.items: list[T] = [
-            model_class.model_validate(item)
-            for item in transformed_data
-        ]
-        self.total: int = len(self.items)
+    @staticmethod
+    def map_relation(value: Any, model_class: type[FiberyBaseModel], is_collection: bool) -> Any:
+        if value is None:
+            return [] if is_collection else None
+        if isinstance(value, list):
+            return QueryResponse.map_rows(value, model_class)
+        return QueryResponse.map_rows([value], model_class)[0]
 
     @staticmethod
-    def _transform_fibery_fields(data: dict[str, Any], model_class: type[T]) -> dict[str, Any]:
-        reverse_map = {
-            fibery_field: field_name
-            for field_name, fibery_field in model_class.FIBERY_FIELD_MAP.items()
-        }
+    def construct_item(row: dict[str, Any], model_class: type[T]) -> T:
+        relations = relation_models(model_class)
+        if relations:
+            # model_construct leaves nested dicts as they are, so related models are built first
+            row = dict(row)
+            for field_name, fibery_field in model_class.FIBERY_RELATIONS.items():
+                value = row.get(field_name)
+                related_class = relations[fibery_field][0]
+                if isinstance(value, list):
+                    row[field_name] = [QueryResponse.construct_item(item, related_class) for item in value]
+                elif value is not None:
+                    row[field_name] = QueryResponse.construct_item(value, related_class)
+        return model_class.model_construct(**row)
+
+    @classmethod
+    def parse_items(cls, data: Iterable[dict[str, Any]], model_class: type[T]) -> list[T]:
+        # Fields accept their Fibery names as validation aliases, so raw rows go straight to pydantic
+        return cast('list[T]', list_adapter(model_class).validate_python(list(data)))
+
+    @classmethod
+    def from_items(cls, items: list[T], model_class: type[T]) -> 'QueryResponse[T]':
+        response = cls(data=[], model_class=model_class)
+        response.items = items
+        response.total = len(items)
+        return response
 
-        transformed = {}
-        for fibery_field, value in data.items():
-            if fibery_field in reverse_map:
-                model_field = reverse_map[fibery_field]
-                transformed[model_field] = value
+    @classmethod
+    def from_rows(
+            cls,
+            rows: list[dict[str, Any]],
+            model_class: type[T],
+            mode: ResultMode,
+    ) -> 'QueryResponse[T]':
+        if mode == ResultMode.VALIDATE:
+            return cls.from_items(cast('list[T]', list_adapter(model_class).validate_python(rows)), model_class)
 
-        return transformed
+        response = cls(data=[], model_class=model_class, mode=mode)
+        response._set_rows(rows, model_class)
+        response.total = len(rows)
+        return response
 
     @classmethod
     def from_raw_response(
             cls,
             response: dict[str, Any],
             model_class: type[T],
+            mode: ResultMode = ResultMode.VALIDATE,
     ) -> 'QueryResponse[T]':
         if not response.get('success'):
             raise FiberyError(f"Query failed: {response.get('error')}")
 
         result = response.get('result', [])
-        return cls(data=result, model_class=model_class)
+        return cls(data=result, model_class=model_class, mode=mode)
 
 
 class QueryResult(BaseModel):
@@ -123,6 +342,32 @@ class QueryResult(BaseModel):
     error: dict[str, Any] | None = None
 
 
+class UploadResult(BaseModel):
+    index: int
+    success: bool
+    entity_id: str | None = None
+    error: str | None = None
+    document_errors: dict[str, str] = {}
+    duration: float = 0.0
+
+
+class UploadSummary(BaseModel):
+    results: list[UploadResult]
+    duration: float
+
+    @property
+    def succeeded(self) -> list[UploadResult]:
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> list[UploadResult]:
+        return [result for result in self.results if not result.success]
+
+    @property
+    def entities_per_second(self) -> float:
+        return len(self.succeeded) / self.duration if self.duration else 0.0
+
+
 class UrlUploadRequest(BaseModel):
     url: str
     name: str | None = None
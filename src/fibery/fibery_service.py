@@ -1,26 +1,58 @@
 import asyncio
+import hashlib
+import json
 import logging
-from collections.abc import Sequence
+import time
+import weakref
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
 from pathlib import Path
 from typing import Any, cast
 
 import httpx
 
-from .builders import EntityBuilder, QueryBuilder
+from .builders import KEYSET_ORDER_BY, EntityBuilder, QueryBuilder
+from .cache import (
+    ANY_TYPE,
+    READ_COMMANDS,
+    CacheBackend,
+    QueryCacheKey,
+    TTLCache,
+    query_cache_key,
+    reads_any,
+)
 from .config import FiberyConfig
+from .dispatcher import CommandDispatcher
 from .entity_model import FiberyBaseModel, RichTextField
 from .fibery_models import (
     DocumentResponse,
+    DownloadResult,
+    EntityCommandResult,
+    FiberyCommand,
     FiberyError,
     FiberyResponse,
     FiberyUploadError,
+    FileAttachResult,
     FileUploadResponse,
     HttpMethod,
     QueryResponse,
     T,
+    UploadResult,
+    UploadSummary,
     UrlUploadRequest,
 )
-from .utils import CollectionOperation, DocumentFormat
+from .rate_limiter import RateLimiter, parse_retry_after
+from .retry import CommandKind, RetryPolicy
+from .streaming import CommandResultParser
+from .upload_index import UploadIndex, file_sha256
+from .utils import (
+    Aggregate,
+    CollectionOperation,
+    DocumentFormat,
+    PaginationMode,
+    ResultMode,
+    chunked,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,20 +64,270 @@ logger.setLevel(logging.INFO)
 
 
 class FiberyService:
-    def __init__(self, token: str | None = None, account: str | None = None, delay: float = 0.32):
+    def __init__(
+            self,
+            token: str | None = None,
+            account: str | None = None,
+            delay: float = 0.32,
+            burst: int = 3,
+            rate_limiter: RateLimiter | None = None,
+            max_throttle_retries: int = 3,
+            retry_policy: RetryPolicy | None = None,
+            stream_queries: bool = False,
+            document_concurrency: int = 4,
+            document_secret_cache: TTLCache[tuple[str, str, str], str] | None = None,
+            query_cache: CacheBackend | None = None,
+            coalesce_queries: bool = False,
+            batch_window: float | None = None,
+            max_batch_size: int = 50,
+            max_connections: int | None = 100,
+            max_keepalive_connections: int | None = 20,
+            keepalive_expiry: float | None = 5.0,
+            http2: bool = False,
+            timeout: float | None = 5.0,
+            prewarm_connections: int = 0,
+            upload_index: UploadIndex | None = None,
+    ):
+        if document_concurrency < 1:
+            raise ValueError(f'Document concurrency must be at least 1, got {document_concurrency}')
+
         self.delay = delay
+        self.rate_limiter = rate_limiter or RateLimiter(
+            rate=1 / delay if delay > 0 else None,
+            burst=burst,
+        )
+        self.max_throttle_retries = max_throttle_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.stream_queries = stream_queries
+        self.document_concurrency = document_concurrency
+        self._document_semaphore = asyncio.Semaphore(document_concurrency)
+        self._document_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self.document_secret_cache = document_secret_cache
+        self.query_cache = query_cache
+        self._write_generations: dict[str, int] = {}
+        self.coalesce_queries = coalesce_queries
+        self._in_flight_queries: dict[QueryCacheKey, asyncio.Future[Any]] = {}
+        self.dispatcher = CommandDispatcher(
+            self._send_commands,
+            window=batch_window,
+            max_batch_size=max_batch_size,
+        ) if batch_window is not None else None
+        self.prewarm_connections = prewarm_connections
+        self.upload_index = upload_index
         self.config = FiberyConfig(token=token, account=account)
         self.client = httpx.AsyncClient(
             base_url=self.config.base_url,
-            headers=self.config.headers
+            headers=self.config.headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            timeout=timeout,
         )
 
     async def __aenter__(self) -> 'FiberyService':
+        if self.prewarm_connections:
+            await self.warm_up(self.prewarm_connections)
         return self
 
+    async def warm_up(self, connections: int = 1) -> int:
+        # Tokens would serialize the requests onto reused connections, so only a server pause is honoured
+        await self.rate_limiter.wait_for_pause()
+        opened = 0
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal opened
+            if event_name == 'connection.connect_tcp.complete':
+                opened += 1
+
+        # Concurrent requests make the pool open one keep-alive connection each
+        responses = await asyncio.gather(
+            *(self.client.head('/', extensions={'trace': trace}) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        for response in responses:
+            if isinstance(response, BaseException):
+                logger.warning(f'Failed to pre-warm connection: {response}')
+            elif response.status_code == 429:
+                self.rate_limiter.on_throttled(parse_retry_after(response.headers.get('Retry-After')))
+        logger.info(f'Pre-warmed {opened} of {connections} connections')
+        return opened
+
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if self.dispatcher is not None:
+            await self.dispatcher.flush()
         await self.client.aclose()
 
+    async def _throttled(
+            self,
+            send: Callable[..., Awaitable[httpx.Response]],
+            url: str,
+            **kwargs: Any,
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            response = await send(url, **kwargs)
+            if response.status_code != 429:
+                self.rate_limiter.on_success()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.rate_limiter.on_throttled(retry_after)
+            logger.warning(
+                f'Rate limited on {url}, retry after {retry_after}s, '
+                f'rate lowered to {self.rate_limiter.rate}/s'
+            )
+            attempt += 1
+            if attempt > self.max_throttle_retries:
+                # Left open so streamed callers can still read the error body
+                return response
+            await self._discard(response)
+
+    async def _request(
+            self,
+            send: Callable[..., Awaitable[httpx.Response]],
+            url: str,
+            retryable: bool = True,
+            **kwargs: Any,
+    ) -> httpx.Response:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self._throttled(send, url, **kwargs)
+            except httpx.HTTPError as error:
+                if not (retryable and self.retry_policy.is_retryable_error(error)):
+                    raise
+                if not await self._wait_for_retry(url, attempt, started, error):
+                    raise
+                continue
+
+            if not (retryable and self.retry_policy.is_retryable_response(response)):
+                return response
+            if not await self._wait_for_retry(url, attempt, started, f'status {response.status_code}'):
+                return response
+            await self._discard(response)
+
+    @staticmethod
+    async def _discard(response: httpx.Response) -> None:
+        # Streamed responses keep their connection until closed
+        await response.aclose()
+
+    async def _open_stream(self, url: str, method: str = 'POST', **kwargs: Any) -> httpx.Response:
+        request = self.client.build_request(method, url, **kwargs)
+        return await self.client.send(request, stream=True)
+
+    async def _wait_for_retry(self, url: str, attempt: int, started: float, reason: object) -> bool:
+        delay = self.retry_policy.backoff(attempt)
+        if not self.retry_policy.should_retry(attempt, time.monotonic() - started + delay):
+            return False
+
+        logger.warning(f'Retrying {url} in {delay:.2f}s after attempt {attempt}: {reason}')
+        await asyncio.sleep(delay)
+        return True
+
+    async def _existing_entity_ids(self, type_name: str, entity_ids: Sequence[str]) -> set[str]:
+        query = QueryBuilder.build_in_query(type_name, ['fibery/id'], 'fibery/id', entity_ids)
+        result = await self._execute_commands([query])
+        response = cast('list', result)[0]
+        if not response.get('success'):
+            raise FiberyError(f"Failed to check existing entities: {response.get('result')}")
+        return {row['fibery/id'] for row in response.get('result') or []}
+
+    async def _drop_existing_creates(
+            self,
+            commands: list[dict[str, Any]],
+    ) -> tuple[list[int], dict[int, dict[str, Any]]]:
+        creates: dict[str, dict[str, int]] = {}
+        for index, command in enumerate(commands):
+            if self.retry_policy.classify_command(command) is CommandKind.ID_STAMPED:
+                args = command['args']
+                creates.setdefault(args['type'], {})[args['entity']['fibery/id']] = index
+
+        existing: dict[int, dict[str, Any]] = {}
+        for type_name, indexes in creates.items():
+            for entity_id in await self._existing_entity_ids(type_name, list(indexes)):
+                existing[indexes[entity_id]] = {'success': True, 'result': {'fibery/id': entity_id}}
+
+        if existing:
+            logger.info(f'Skipping {len(existing)} creates that reached the server before the retry')
+        return [index for index in range(len(commands)) if index not in existing], existing
+
+    def _invalidate_queries(self, type_names: set[str]) -> None:
+        for type_name in (*type_names, ANY_TYPE):
+            self._write_generations[type_name] = self._write_generations.get(type_name, 0) + 1
+        if self.query_cache is not None and type_names:
+            self.query_cache.discard_if(lambda key: reads_any(key, type_names))
+        # Later readers must not join a query that may have started before the write
+        for key in [key for key in self._in_flight_queries if reads_any(key, type_names)]:
+            del self._in_flight_queries[key]
+
+    def _generation(self, type_names: frozenset[str]) -> tuple[int, ...]:
+        return tuple(self._write_generations.get(type_name, 0) for type_name in sorted(type_names))
+
+    async def _execute_commands(self, commands: list[dict[str, Any]]) -> Any:
+        written = {
+            command['args']['type']
+            for command in commands
+            if command.get('command') not in READ_COMMANDS and 'type' in command.get('args', {})
+        }
+        if not written:
+            return await self._dispatch(commands)
+
+        # Invalidate again once the write lands so reads racing it are not cached
+        self._invalidate_queries(written)
+        try:
+            return await self._dispatch(commands)
+        finally:
+            self._invalidate_queries(written)
+
+    async def _dispatch(self, commands: list[dict[str, Any]]) -> Any:
+        if self.dispatcher is None or len(commands) != 1:
+            return await self._send_commands(commands)
+        return [await self.dispatcher.submit(commands[0])]
+
+    async def _send_commands(self, commands: list[dict[str, Any]]) -> Any:
+        kind = self.retry_policy.classify_batch(commands)
+        retryable = kind is not CommandKind.UNSAFE
+        started = time.monotonic()
+        pending = list(range(len(commands)))
+        completed: dict[int, dict[str, Any]] = {}
+        attempt = 0
+        while True:
+            attempt += 1
+            payload = [commands[index] for index in pending]
+            try:
+                response = await self._throttled(self.client.post, '/api/commands', json=payload)
+            except httpx.HTTPError as error:
+                if not (retryable and self.retry_policy.is_retryable_error(error)):
+                    raise
+                if not await self._wait_for_retry('/api/commands', attempt, started, error):
+                    raise
+            else:
+                if not (retryable and self.retry_policy.is_retryable_response(response)):
+                    break
+                if not await self._wait_for_retry('/api/commands', attempt, started, f'status {response.status_code}'):
+                    break
+
+            if kind is CommandKind.ID_STAMPED:
+                remaining, existing = await self._drop_existing_creates(payload)
+                completed.update({pending[index]: result for index, result in existing.items()})
+                pending = [pending[index] for index in remaining]
+                if not pending:
+                    return [completed[index] for index in range(len(commands))]
+
+        logger.info(response.text)
+        result = response.json()
+        if not completed or not isinstance(result, list):
+            return result
+
+        completed.update(zip(pending, result, strict=False))
+        return [completed.get(index) for index in range(len(commands))]
+
     def get_headers(self) -> dict[str, str]:
         headers = {
             'Authorization': self.client.headers.get('authorization'),
@@ -54,22 +336,70 @@ class FiberyService:
         }
         return {k: v for k, v in headers.items() if v is not None}
 
+    def _cache_document_secrets(self, type_name: str, secrets: dict[str, dict[str, str]]) -> None:
+        if self.document_secret_cache is None:
+            return
+        for entity_id, fields in secrets.items():
+            for field_name, secret in fields.items():
+                self.document_secret_cache.set((type_name, entity_id, field_name), secret)
+
     async def get_document_secret(
             self,
             type_name: str,
             entity_id: str,
             field_name: str
     ) -> str | None:
+        if self.document_secret_cache is not None:
+            cached = self.document_secret_cache.get((type_name, entity_id, field_name))
+            if cached is not None:
+                return cached
+
         try:
             query = QueryBuilder.build_document_query(type_name, entity_id, field_name)
-            response = await self.client.post('/api/commands', json=[query])
-            logger.info(response.text)
-            result = response.json()
-            return DocumentResponse.from_raw_response(result[0], field_name)
+            result = await self._execute_commands([query])
+            secret = DocumentResponse.from_raw_response(result[0], field_name)
         except httpx.HTTPError as error:
             logger.error(error)
             raise FiberyError(f'Failed to get document secret: {error}') from error
 
+        if secret:
+            self._cache_document_secrets(type_name, {entity_id: {field_name: secret}})
+        return secret
+
+    async def get_document_secrets(
+            self,
+            type_name: str,
+            entity_ids: Sequence[str],
+            field_names: Sequence[str],
+            chunk_size: int = 100,
+    ) -> dict[str, dict[str, str]]:
+        secrets: dict[str, dict[str, str]] = {}
+        missing = list(entity_ids)
+        if self.document_secret_cache is not None:
+            missing = []
+            for entity_id in entity_ids:
+                cached = {
+                    field_name: secret
+                    for field_name in field_names
+                    if (secret := self.document_secret_cache.get((type_name, entity_id, field_name))) is not None
+                }
+                if len(cached) == len(field_names):
+                    secrets[entity_id] = cached
+                else:
+                    missing.append(entity_id)
+
+        try:
+            for chunk in chunked(missing, chunk_size):
+                query = QueryBuilder.build_documents_query(type_name, chunk, field_names)
+                result = await self._execute_commands([query])
+                fetched = DocumentResponse.secrets_from_raw_response(result[0], field_names)
+                self._cache_document_secrets(type_name, fetched)
+                secrets.update(fetched)
+        except httpx.HTTPError as error:
+            logger.error(error)
+            raise FiberyError(f'Failed to get document secrets: {error}') from error
+        return secrets
+
     async def update_document(
             self,
             document_secret: str,
@@ -77,7 +407,8 @@ class FiberyService:
             document_format: DocumentFormat = DocumentFormat.MARKDOWN
     ) -> bool:
         try:
-            response = await self.client.put(
+            response = await self._request(
+                self.client.put,
                 f'/api/documents/{document_secret}',
                 params={'format': str(document_format)},
                 json={'content': content}
@@ -96,9 +427,7 @@ class FiberyService:
     ) -> tuple[str, FiberyResponse]:
         try:
             entity_id, command = EntityBuilder.prepare_command(type_name, item)
-            response = await self.client.post('/api/commands', json=[command.model_dump()])
-            logger.info(response.text)
-            result = response.json()
+            result = await self._execute_commands([command.model_dump()])
             result_list = cast('list', result)
 
             return entity_id, FiberyResponse(
@@ -109,50 +438,126 @@ class FiberyService:
             logger.error(error)
             raise FiberyError(f'Failed to create entity: {error}') from error
 
+    async def create_entities(
+            self,
+            models: Sequence[FiberyBaseModel],
+            type_name: str,
+            chunk_size: int = 100,
+    ) -> list[EntityCommandResult]:
+        results: list[EntityCommandResult] = []
+        for chunk in chunked(models, chunk_size):
+            prepared = [EntityBuilder.prepare_command(type_name, model) for model in chunk]
+            entity_ids = [entity_id for entity_id, _ in prepared]
+            try:
+                response = await self._execute_commands(
+                    [command.model_dump() for _, command in prepared]
+                )
+            except httpx.HTTPError as error:
+                logger.error(error)
+                results.extend(
+                    EntityCommandResult(entity_id=entity_id, success=False, error=str(error))
+                    for entity_id in entity_ids
+                )
+                continue
+
+            results.extend(EntityCommandResult.from_raw_responses(entity_ids, response))
+
+        failed = sum(1 for result in results if not result.success)
+        logger.info(f'Created {len(results) - failed} of {len(results)} entities of {type_name}')
+        return results
+
+    async def _write_document(self, secret: str, rich_text: RichTextField) -> None:
+        # Writes to the same document are applied in the order they were issued
+        lock = self._document_locks.get(secret)
+        if lock is None:
+            lock = self._document_locks[secret] = asyncio.Lock()
+
+        async with lock, self._document_semaphore:
+            updated = await self.update_document(
+                document_secret=secret,
+                content=rich_text.content,
+                document_format=rich_text.format
+            )
+        if not updated:
+            raise FiberyError('Document update was not acknowledged')
+
+    async def _update_documents(
+            self,
+            type_name: str,
+            contents: dict[str, dict[str, RichTextField]]
+    ) -> dict[str, dict[str, str]]:
+        contents = {entity_id: fields for entity_id, fields in contents.items() if fields}
+        if not contents:
+            return {}
+
+        field_names = sorted({field_name for fields in contents.values() for field_name in fields})
+        try:
+            secrets = await self.get_document_secrets(type_name, list(contents), field_names)
+        except Exception as error:
+            logger.error(f'Error resolving document secrets for {type_name}: {error}')
+            return {
+                entity_id: {field_name: str(error) for field_name in fields}
+                for entity_id, fields in contents.items()
+            }
+
+        errors: dict[str, dict[str, str]] = {}
+        writes: list[tuple[str, str, Awaitable[None]]] = []
+        for entity_id, field_contents in contents.items():
+            for field_name, rich_text in field_contents.items():
+                secret = secrets.get(entity_id, {}).get(field_name)
+                if not secret:
+                    logger.warning(f'No document found for field {field_name} of {entity_id}')
+                    errors.setdefault(entity_id, {})[field_name] = 'Document not found'
+                    continue
+                writes.append((entity_id, field_name, self._write_document(secret, rich_text)))
+
+        outcomes = await asyncio.gather(*(write for _, _, write in writes), return_exceptions=True)
+        for (entity_id, field_name, _), outcome in zip(writes, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.error(f'Error updating field {field_name} of {entity_id}: {outcome}')
+                errors.setdefault(entity_id, {})[field_name] = str(outcome)
+                if self.document_secret_cache is not None:
+                    self.document_secret_cache.pop((type_name, entity_id, field_name))
+        return errors
+
     async def _update_rich_text_fields(
             self,
             entity_id: str,
             type_name: str,
             field_contents: dict[str, RichTextField]
-    ) -> None:
-        for field_name, rich_text in field_contents.items():
-            try:
-                secret = await self.get_document_secret(
-                    type_name=type_name,
-                    entity_id=entity_id,
-                    field_name=field_name
-                )
-                if secret:
-                    await self.update_document(
-                        document_secret=secret,
-                        content=rich_text.content,
-                        document_format=rich_text.format
-                    )
-                    await asyncio.sleep(self.delay)
-            except Exception as error:
-                logger.error(f'Error updating field {field_name}: {error}')
+    ) -> dict[str, str]:
+        errors = await self._update_documents(type_name, {entity_id: field_contents})
+        return errors.get(entity_id, {})
 
-    async def upload_entity(
+    async def _upload_entity(
             self,
             model: FiberyBaseModel,
             type_name: str,
-    ) -> str:
+    ) -> tuple[str, dict[str, str]]:
         try:
             entity_id, response = await self.create_entity(model, type_name)
             if not response.success:
                 raise FiberyUploadError(f'Failed to create entity: {response.result}')
 
-            await self._update_rich_text_fields(
+            document_errors = await self._update_rich_text_fields(
                 entity_id=entity_id,
                 type_name=type_name,
                 field_contents=model.get_rich_text_content()
             )
-            return entity_id
+            return entity_id, document_errors
 
         except Exception as error:
             logger.error(error)
             raise FiberyUploadError(f'Failed to upload documents for {model}: {error}') from error
 
+    async def upload_entity(
+            self,
+            model: FiberyBaseModel,
+            type_name: str,
+    ) -> str:
+        entity_id, _ = await self._upload_entity(model, type_name)
+        return entity_id
+
     async def upload_sequential(
             self,
             data_list: list[FiberyBaseModel],
@@ -169,95 +574,507 @@ class FiberyService:
                 logger.error(error)
                 raise FiberyUploadError(f'Failed to upload entity {model}: {error}') from error
 
-            await asyncio.sleep(self.delay)
+    async def upload_entities(
+            self,
+            models: Sequence[FiberyBaseModel],
+            type_name: str,
+            chunk_size: int = 100,
+    ) -> list[EntityCommandResult]:
+        results: list[EntityCommandResult] = []
+        for chunk in chunked(models, chunk_size):
+            chunk_results = await self.create_entities(chunk, type_name, chunk_size=chunk_size)
+            document_errors = await self._update_documents(type_name, {
+                result.entity_id: model.get_rich_text_content()
+                for result, model in zip(chunk_results, chunk, strict=True)
+                if result.success
+            })
+            for result in chunk_results:
+                result.document_errors = document_errors.get(result.entity_id, {})
+            results.extend(chunk_results)
+        return results
+
+    async def _upload_indexed(
+            self,
+            index: int,
+            model: FiberyBaseModel,
+            type_name: str,
+    ) -> UploadResult:
+        started = time.perf_counter()
+        try:
+            entity_id, document_errors = await self._upload_entity(model=model, type_name=type_name)
+        except Exception as error:
+            logger.error(f'Failed to upload entity {model}: {error}')
+            return UploadResult(
+                index=index,
+                success=False,
+                error=str(error),
+                duration=time.perf_counter() - started,
+            )
+
+        return UploadResult(
+            index=index,
+            success=True,
+            entity_id=entity_id,
+            document_errors=document_errors,
+            duration=time.perf_counter() - started,
+        )
+
+    async def upload_concurrent(
+            self,
+            data_list: Sequence[FiberyBaseModel],
+            type_name: str,
+            workers: int = 4,
+    ) -> UploadSummary:
+        if workers < 1:
+            raise ValueError(f'Number of workers must be positive, got {workers}')
+
+        started = time.perf_counter()
+        pending = iter(enumerate(data_list))
+        results: list[UploadResult] = []
+
+        async def worker() -> None:
+            for index, model in pending:
+                results.append(await self._upload_indexed(index, model, type_name))
+
+        await asyncio.gather(*(worker() for _ in range(min(workers, len(data_list)))))
+
+        summary = UploadSummary(
+            results=sorted(results, key=lambda result: result.index),
+            duration=time.perf_counter() - started,
+        )
+        logger.info(
+            f'Uploaded {len(summary.succeeded)} of {len(data_list)} entities '
+            f'in {summary.duration:.2f}s ({len(summary.failed)} failed)'
+        )
+        return summary
+
+    async def _fetch_query(self, query: dict[str, Any]) -> dict[str, Any]:
+        result = await self._execute_commands([query])
+        result_list = cast('list', result)
+        return cast('dict', result_list[0])
+
+    async def _stream_query(
+            self,
+            query: dict[str, Any],
+            model_class: type[T],
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> QueryResponse[T]:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            response = await self._request(self._open_stream, '/api/commands', json=[query])
+            try:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise FiberyError(f'Query failed with status {response.status_code}: {response.text}')
+
+                parser = CommandResultParser()
+                items: list[T] = []
+                rows: list[dict[str, Any]] = []
+                async for chunk in response.aiter_bytes():
+                    if result_mode == ResultMode.VALIDATE:
+                        items.extend(QueryResponse.parse_items(parser.feed(chunk), model_class))
+                    else:
+                        rows.extend(QueryResponse.map_rows(parser.feed(chunk), model_class))
+                if result_mode == ResultMode.VALIDATE:
+                    items.extend(QueryResponse.parse_items(parser.close(), model_class))
+                else:
+                    rows.extend(QueryResponse.map_rows(parser.close(), model_class))
+            except httpx.TransportError as error:
+                if not await self._wait_for_retry('/api/commands', attempt, started, error):
+                    raise
+                continue
+            finally:
+                await response.aclose()
+
+            if not parser.success:
+                raise FiberyError(f"Query failed: {parser.fields.get('error') or parser.fields.get('result')}")
+            logger.info(f'Streamed {len(items) + len(rows)} items of {query["args"]["query"]["q/from"]}')
+            if result_mode == ResultMode.VALIDATE:
+                return QueryResponse.from_items(items, model_class)
+            return QueryResponse.from_rows(rows, model_class, result_mode)
+
+    async def _run_query(
+            self,
+            query: dict[str, Any],
+            model_class: type[T],
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> QueryResponse[T]:
+        if self.query_cache is None and not self.coalesce_queries:
+            return await self._load_query(query, model_class, result_mode)
+
+        key = query_cache_key(query, model_class, result_mode)
+        if self.query_cache is not None:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cast('QueryResponse[T]', cached)
+
+        if not self.coalesce_queries:
+            return await self._load_and_cache(key, query, model_class, result_mode)
+
+        task = self._in_flight_queries.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load_and_cache(key, query, model_class, result_mode))
+            self._in_flight_queries[key] = task
+            task.add_done_callback(lambda done: self._forget_query(key, done))
+        # Shielded so a cancelled caller does not cancel the request shared with others
+        return cast('QueryResponse[T]', await asyncio.shield(task))
+
+    def _forget_query(self, key: QueryCacheKey, task: asyncio.Future[Any]) -> None:
+        if self._in_flight_queries.get(key) is task:
+            del self._in_flight_queries[key]
+
+    async def _load_and_cache(
+            self,
+            key: QueryCacheKey,
+            query: dict[str, Any],
+            model_class: type[T],
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> QueryResponse[T]:
+        generation = self._generation(key[0])
+        response = await self._load_query(query, model_class, result_mode)
+        if self.query_cache is not None and self._generation(key[0]) == generation:
+            self.query_cache.set(key, response)
+        return response
+
+    async def _load_query(
+            self,
+            query: dict[str, Any],
+            model_class: type[T],
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> QueryResponse[T]:
+        if self.stream_queries:
+            return await self._stream_query(query, model_class, result_mode)
+        response = await self._fetch_query(query)
+        return QueryResponse.from_raw_response(response, model_class, result_mode)
+
+    async def _prefetch_pages(
+            self,
+            build_query: Callable[[int], dict[str, Any]],
+            page_size: int,
+            depth: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        in_flight: deque[asyncio.Task[dict[str, Any]]] = deque()
+        next_offset = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < depth:
+                    in_flight.append(asyncio.create_task(self._fetch_query(build_query(next_offset))))
+                    next_offset += page_size
+                if not in_flight:
+                    return
+
+                response = await in_flight.popleft()
+                if len(response.get('result') or []) < page_size:
+                    exhausted = True
+                    for task in in_flight:
+                        task.cancel()
+                    await asyncio.gather(*in_flight, return_exceptions=True)
+                    in_flight.clear()
+                yield response
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def iter_pages(
+            self,
+            type_name: str,
+            fields: Sequence[str | dict[Any, Any]] | None,
+            model_class: type[T],
+            where: list[Any] | None = None,
+            order_by: list[list[Any]] | None = None,
+            params: dict | None = None,
+            page_size: int = 500,
+            pagination: PaginationMode = PaginationMode.OFFSET,
+            prefetch: int = 0,
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> AsyncIterator[QueryResponse[T]]:
+        if page_size < 1:
+            raise ValueError(f'Page size must be positive, got {page_size}')
+        if pagination == PaginationMode.KEYSET and order_by is not None:
+            raise ValueError('Keyset pagination orders by fibery/creation-date and fibery/id')
+        if pagination == PaginationMode.KEYSET and prefetch:
+            raise ValueError('Keyset pagination needs the previous page and cannot prefetch')
+
+        select = self._select(fields, model_class)
+
+        def offset_query(offset: int) -> dict[str, Any]:
+            return QueryBuilder.build_entities_query(
+                type_name=type_name,
+                fields=select,
+                where=where,
+                order_by=order_by or KEYSET_ORDER_BY,
+                limit=page_size,
+                offset=offset,
+                params=params
+            )
+
+        if prefetch:
+            async for response in self._prefetch_pages(offset_query, page_size, prefetch):
+                page = QueryResponse.from_raw_response(response, model_class, result_mode)
+                if page.total:
+                    yield page
+            return
+
+        offset = 0
+        cursor: tuple[Any, str] | None = None
+        while True:
+            if pagination == PaginationMode.KEYSET:
+                query = QueryBuilder.build_keyset_query(
+                    type_name=type_name,
+                    fields=select,
+                    page_size=page_size,
+                    cursor=cursor,
+                    where=where,
+                    params=params
+                )
+            else:
+                query = offset_query(offset)
+
+            response = await self._fetch_query(query)
+            rows = response.get('result') or []
+            page = QueryResponse.from_raw_response(response, model_class, result_mode)
+            if page.total:
+                yield page
+            if len(rows) < page_size:
+                return
+
+            if pagination == PaginationMode.KEYSET:
+                cursor = (rows[-1]['fibery/creation-date'], rows[-1]['fibery/id'])
+            else:
+                offset += page_size
+
+    async def iter_entities(
+            self,
+            type_name: str,
+            fields: Sequence[str | dict[Any, Any]] | None,
+            model_class: type[T],
+            where: list[Any] | None = None,
+            order_by: list[list[Any]] | None = None,
+            params: dict | None = None,
+            page_size: int = 500,
+            pagination: PaginationMode = PaginationMode.OFFSET,
+            prefetch: int = 0,
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> AsyncIterator[T]:
+        pages = self.iter_pages(
+            type_name=type_name,
+            fields=fields,
+            model_class=model_class,
+            where=where,
+            order_by=order_by,
+            params=params,
+            page_size=page_size,
+            pagination=pagination,
+            prefetch=prefetch,
+            result_mode=result_mode
+        )
+        async for page in pages:
+            for item in page.items:
+                yield item
+
+    @staticmethod
+    def _select(
+            fields: Sequence[str | dict[Any, Any]] | None,
+            model_class: type[FiberyBaseModel],
+    ) -> list[str | dict[Any, Any]]:
+        return list(fields) if fields is not None else QueryBuilder.build_select(model_class)
 
     async def query_entities(
             self,
             type_name: str,
-            fields: Sequence[str | dict[Any, Any]],
+            fields: Sequence[str | dict[Any, Any]] | None,
             model_class: type[T],
             where: list[Any] | None = None,
             order_by: list[list[Any]] | None = None,
             limit: int | str = 'q/no-limit',
             offset: int | None = None,
-            params: dict | None = None
+            params: dict | None = None,
+            result_mode: ResultMode = ResultMode.VALIDATE
     ) -> QueryResponse[T]:
         query = QueryBuilder.build_entities_query(
             type_name=type_name,
-            fields=fields,
+            fields=self._select(fields, model_class),
             where=where,
             order_by=order_by,
             limit=limit,
             offset=offset,
             params=params
         )
-        response = await self.client.post('/api/commands', json=[query])
-        logger.info(response.text)
-        result = response.json()
-        result_list = cast('list', result)
-        return QueryResponse.from_raw_response(result_list[0], model_class)
+        return await self._run_query(query, model_class, result_mode)
 
     async def get_entities(
             self,
             type_name: str,
-            fields: Sequence[str],
+            fields: Sequence[str] | None,
             model_class: type[T],
-            limit: int = 100
+            limit: int = 100,
+            result_mode: ResultMode = ResultMode.VALIDATE
     ) -> QueryResponse[T]:
         return await self.query_entities(
             type_name=type_name,
             fields=fields,
             model_class=model_class,
-            limit=limit
+            limit=limit,
+            result_mode=result_mode
         )
 
     async def get_filtered_entities(
             self,
             type_name: str,
-            fields: Sequence[str],
+            fields: Sequence[str] | None,
             model_class: type[T],
             field_name: str,
             operator: str,
             value: Any,
-            limit: int = 100
+            limit: int = 100,
+            result_mode: ResultMode = ResultMode.VALIDATE
     ) -> QueryResponse[T]:
         query = QueryBuilder.build_filtered_query(
             type_name=type_name,
-            fields=fields,
+            fields=self._select(fields, model_class),
             field_name=field_name,
             operator=operator,
             value=value,
             limit=limit
         )
-        response = await self.client.post('/api/commands', json=[query])
-        logger.info(response.text)
-        result = response.json()
-        result_list = cast('list', result)
-        return QueryResponse.from_raw_response(result_list[0], model_class)
+        return await self._run_query(query, model_class, result_mode)
 
     async def get_entities_by_date_range(
             self,
             type_name: str,
-            fields: Sequence[str],
+            fields: Sequence[str] | None,
             model_class: type[T],
             date_field: str,
             start_date: str | Any,
             end_date: str | Any,
-            limit: int = 100
+            limit: int = 100,
+            result_mode: ResultMode = ResultMode.VALIDATE
     ) -> QueryResponse[T]:
         query = QueryBuilder.build_date_range_query(
             type_name=type_name,
-            fields=fields,
+            fields=self._select(fields, model_class),
             date_field=date_field,
             start_date=start_date,
             end_date=end_date,
             limit=limit
         )
-        response = await self.client.post('/api/commands', json=[query])
-        logger.info(response.text)
-        result = response.json()
-        result_list = cast('list', result)
-        return QueryResponse.from_raw_response(result_list[0], model_class)
+        return await self._run_query(query, model_class, result_mode)
+
+    async def get_entities_by_ids(
+            self,
+            type_name: str,
+            ids: Sequence[str],
+            model_class: type[T],
+            fields: Sequence[str | dict[Any, Any]] | None = None,
+            chunk_size: int = 100,
+            concurrency: int = 4,
+            result_mode: ResultMode = ResultMode.VALIDATE,
+    ) -> dict[str, T]:
+        if concurrency < 1:
+            raise ValueError(f'Concurrency must be positive, got {concurrency}')
+        # Keying by id needs every item, so lazy validation would gain nothing and raw rows are not models
+        if result_mode not in (ResultMode.VALIDATE, ResultMode.TRUSTED):
+            raise ValueError(f'get_entities_by_ids supports validate and trusted results, got {result_mode}')
+
+        fields = self._select(fields, model_class)
+        if 'fibery/id' not in fields:
+            fields.append('fibery/id')
+
+        chunks = list(chunked(list(dict.fromkeys(ids)), chunk_size))
+        pending = iter(chunks)
+        entities: dict[str, T] = {}
+
+        async def worker() -> None:
+            for chunk in pending:
+                query = QueryBuilder.build_in_query(type_name, fields, 'fibery/id', chunk, limit=len(chunk))
+                response = await self._run_query(query, model_class, result_mode)
+                entities.update((cast('str', item.fibery_id), item) for item in response.items)
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(chunks)))))
+        return entities
+
+    async def _fetch_aggregate(self, query: dict[str, Any]) -> list[dict[str, Any]]:
+        try:
+            response = await self._fetch_query(query)
+        except httpx.HTTPError as error:
+            logger.error(error)
+            raise FiberyError(f'Failed to aggregate entities: {error}') from error
+        if not response.get('success'):
+            raise FiberyError(f"Aggregate query failed: {response.get('result')}")
+        return cast('list[dict[str, Any]]', response.get('result') or [])
+
+    async def count_entities(
+            self,
+            type_name: str,
+            where: list[Any] | None = None,
+            params: dict | None = None,
+    ) -> int:
+        rows = await self._fetch_aggregate(QueryBuilder.build_count_query(type_name, where, params))
+        return int(rows[0]['count']) if rows else 0
+
+    async def aggregate_entities(
+            self,
+            type_name: str,
+            aggregates: dict[str, tuple[Aggregate | str, str | list[str]]],
+            group_by: dict[str, str | list[str]] | None = None,
+            where: list[Any] | None = None,
+            params: dict | None = None,
+    ) -> list[dict[str, Any]]:
+        query = QueryBuilder.build_aggregate_query(
+            type_name=type_name,
+            aggregates=aggregates,
+            group_by=group_by,
+            where=where,
+            params=params
+        )
+        return await self._fetch_aggregate(query)
+
+    async def execute_batch(
+            self,
+            operations: Sequence[FiberyCommand | dict[str, Any] | tuple[dict[str, Any], type[Any]]],
+            result_mode: ResultMode = ResultMode.VALIDATE,
+            return_exceptions: bool = False,
+    ) -> list[FiberyResponse | QueryResponse[Any] | Exception]:
+        commands: list[dict[str, Any]] = []
+        model_classes: list[type[Any] | None] = []
+        for operation in operations:
+            if isinstance(operation, tuple):
+                query, query_model = operation
+                commands.append(query)
+                model_classes.append(query_model)
+            elif isinstance(operation, FiberyCommand):
+                commands.append(operation.model_dump())
+                model_classes.append(None)
+            else:
+                commands.append(operation)
+                model_classes.append(None)
+        if not commands:
+            return []
+
+        try:
+            result = await self._execute_commands(commands)
+        except httpx.HTTPError as error:
+            logger.error(error)
+            raise FiberyError(f'Failed to execute batch: {error}') from error
+        if not isinstance(result, list) or len(result) != len(commands):
+            raise FiberyError(f'Unexpected response for a batch of {len(commands)} commands: {result}')
+
+        results: list[FiberyResponse | QueryResponse[Any] | Exception] = []
+        for response, model_class in zip(result, model_classes, strict=True):
+            if model_class is None:
+                results.append(FiberyResponse(success=bool(response.get('success')), result=response))
+                continue
+            try:
+                results.append(QueryResponse.from_raw_response(response, model_class, result_mode))
+            except FiberyError as error:
+                if not return_exceptions:
+                    raise
+                results.append(error)
+        return results
 
     async def update_entity(
             self,
@@ -267,9 +1084,7 @@ class FiberyService:
     ) -> FiberyResponse:
         try:
             command = EntityBuilder.prepare_update_command(type_name, entity_id, updates)
-            response = await self.client.post('/api/commands', json=[command.model_dump()])
-            logger.info(response.text)
-            result = response.json()
+            result = await self._execute_commands([command.model_dump()])
             result_list = cast('list', result)
 
             logger.info(f'Updating entity {entity_id}')
@@ -281,6 +1096,115 @@ class FiberyService:
             logger.error(error)
             raise FiberyError(f'Failed to update entity: {error}') from error
 
+    async def bulk_update(
+            self,
+            type_name: str,
+            updates: Sequence[tuple[str, dict[str, Any]] | tuple[str, dict[str, Any], dict[str, Any]]],
+            chunk_size: int = 100,
+    ) -> list[EntityCommandResult]:
+        results: dict[int, EntityCommandResult] = {}
+        pending: list[tuple[int, str, dict[str, Any]]] = []
+        for index, (entity_id, changes, *previous) in enumerate(updates):
+            if previous:
+                changes = EntityBuilder.diff_updates(changes, previous[0])
+            if not changes:
+                results[index] = EntityCommandResult(entity_id=entity_id, success=True, skipped=True)
+                continue
+            pending.append((index, entity_id, changes))
+
+        for chunk in chunked(pending, chunk_size):
+            entity_ids = [entity_id for _, entity_id, _ in chunk]
+            try:
+                response = await self._execute_commands([
+                    EntityBuilder.prepare_update_command(type_name, entity_id, changes).model_dump()
+                    for _, entity_id, changes in chunk
+                ])
+            except httpx.HTTPError as error:
+                logger.error(error)
+                chunk_results = [
+                    EntityCommandResult(entity_id=entity_id, success=False, error=str(error))
+                    for entity_id in entity_ids
+                ]
+            else:
+                chunk_results = EntityCommandResult.from_raw_responses(entity_ids, response)
+            results.update(zip((index for index, _, _ in chunk), chunk_results, strict=True))
+
+        failed = sum(1 for result in results.values() if not result.success)
+        logger.info(
+            f'Updated {len(pending) - failed} of {len(updates)} entities of {type_name} '
+            f'({len(updates) - len(pending)} unchanged, {failed} failed)'
+        )
+        return [results[index] for index in range(len(updates))]
+
+    async def _resolve_keys(
+            self,
+            type_name: str,
+            key_field: str,
+            keys: Sequence[Any],
+            chunk_size: int = 100,
+    ) -> dict[Any, str]:
+        existing: dict[Any, str] = {}
+        for chunk in chunked(keys, chunk_size):
+            query = QueryBuilder.build_in_query(type_name, ['fibery/id', key_field], key_field, chunk)
+            response = await self._fetch_query(query)
+            if not response.get('success'):
+                raise FiberyError(f"Failed to resolve {key_field} of {type_name}: {response.get('result')}")
+            existing.update((row[key_field], row['fibery/id']) for row in response.get('result') or [])
+        return existing
+
+    async def upsert_entities(
+            self,
+            type_name: str,
+            models: Sequence[FiberyBaseModel],
+            key_field: str,
+            chunk_size: int = 100,
+    ) -> dict[Any, str]:
+        by_key: dict[Any, FiberyBaseModel] = {}
+        for model in models:
+            key = model.to_fibery_fields().get(key_field)
+            if key is None:
+                raise ValueError(f'{model} has no value for key field {key_field}')
+            if key in by_key:
+                raise ValueError(f'Duplicate value {key!r} for key field {key_field}')
+            by_key[key] = model
+
+        try:
+            ids = await self._resolve_keys(type_name, key_field, list(by_key), chunk_size)
+        except httpx.HTTPError as error:
+            logger.error(error)
+            raise FiberyError(f'Failed to upsert entities: {error}') from error
+
+        creates = [(key, model) for key, model in by_key.items() if key not in ids]
+        updates = [
+            (ids[key], {
+                field: value
+                for field, value in model.to_fibery_fields().items()
+                if field not in ('fibery/id', key_field)
+            })
+            for key, model in by_key.items()
+            if key in ids
+        ]
+
+        created = await self.create_entities([model for _, model in creates], type_name, chunk_size)
+        updated = await self.bulk_update(type_name, updates, chunk_size)
+
+        failed = [result for result in [*created, *updated] if not result.success]
+        for result in failed:
+            logger.error(f'Failed to upsert {result.entity_id} of {type_name}: {result.error}')
+
+        failed_ids = {result.entity_id for result in failed}
+        upserted = {key: entity_id for key, entity_id in ids.items() if entity_id not in failed_ids}
+        upserted.update(
+            (key, result.entity_id)
+            for (key, _), result in zip(creates, created, strict=True)
+            if result.success
+        )
+        logger.info(
+            f'Upserted {len(upserted)} of {len(by_key)} entities of {type_name} '
+            f'({len(creates)} new, {len(updates)} existing, {len(failed)} failed)'
+        )
+        return upserted
+
     async def find_and_update_entity(
             self,
             type_name: str,
@@ -297,7 +1221,8 @@ class FiberyService:
                 field_name=search_field,
                 operator='=',
                 value=search_value,
-                limit=1
+                limit=1,
+                result_mode=ResultMode.TRUSTED
             )
 
             logger.info('Successfully found entity')
@@ -334,12 +1259,7 @@ class FiberyService:
                 operation=operation
             )
 
-            response = await self.client.post(
-                '/api/commands',
-                json=[command.model_dump()]
-            )
-            logger.info(response.text)
-            result = response.json()
+            result = await self._execute_commands([command.model_dump()])
             result_list = cast('list', result)
 
             return FiberyResponse(
@@ -389,20 +1309,32 @@ class FiberyService:
             raise FiberyError(f'File not found: {file_path}')
 
         try:
+            sha256 = None
+            if self.upload_index is not None:
+                # Hashing a large scan must not block other uploads on the event loop
+                sha256 = await asyncio.to_thread(file_sha256, file_path)
+                known = self.upload_index.get(sha256)
+                if known is not None:
+                    logger.info(f'Reusing uploaded file {known.id} for {file_path}')
+                    return known
+
             with file_path.open('rb') as f:
                 files = {'file': (file_path.name, f)}
 
-                headers = self.get_headers()
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f'{self.client.base_url}/api/files',
-                        headers=headers,
-                        files=files
-                    )
+                response = await self._request(
+                    self.client.post,
+                    '/api/files',
+                    retryable=False,
+                    headers=self.get_headers(),
+                    files=files
+                )
 
                 logger.info(response.text)
                 result = response.json()
-                return FileUploadResponse.model_validate(result)
+                uploaded = FileUploadResponse.model_validate(result)
+                if self.upload_index is not None and sha256 is not None:
+                    self.upload_index.put(sha256, uploaded)
+                return uploaded
 
         except httpx.HTTPError as error:
             logger.error(f'HTTP error during upload: {error}')
@@ -427,11 +1359,12 @@ class FiberyService:
                 headers=headers,
             )
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    '/api/files/from-url',
-                    json=request.model_dump(exclude_none=True)
-                )
+            response = await self._request(
+                self.client.post,
+                '/api/files/from-url',
+                retryable=False,
+                json=request.model_dump(exclude_none=True)
+            )
             logger.info(response.text)
 
             if response.status_code != 200:
@@ -443,13 +1376,85 @@ class FiberyService:
             logger.error(f'Failed to upload file from URL: {error}')
             raise FiberyError(f'Failed to upload file from URL: {error}') from error
 
+    async def _upload_indexed_file(self, index: int, path: str | Path) -> FileAttachResult:
+        started = time.perf_counter()
+        try:
+            file = await self.upload_file(path)
+        except Exception as error:
+            return FileAttachResult(
+                index=index,
+                path=str(path),
+                success=False,
+                error=str(error),
+                duration=time.perf_counter() - started,
+            )
+        return FileAttachResult(
+            index=index,
+            path=str(path),
+            success=False,
+            file=file,
+            duration=time.perf_counter() - started,
+        )
+
+    async def upload_and_attach(
+            self,
+            type_name: str,
+            entity_id: str,
+            paths: Sequence[str | Path],
+            concurrency: int = 4,
+            chunk_size: int = 100,
+            field: str = 'Files/Files',
+    ) -> list[FileAttachResult]:
+        if concurrency < 1:
+            raise ValueError(f'Concurrency must be positive, got {concurrency}')
+
+        pending = iter(enumerate(paths))
+        results: list[FileAttachResult] = []
+
+        async def worker() -> None:
+            for index, path in pending:
+                results.append(await self._upload_indexed_file(index, path))
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(paths)))))
+        results.sort(key=lambda result: result.index)
+
+        chunks = list(chunked([result for result in results if result.file is not None], chunk_size))
+        if not chunks:
+            return results
+
+        commands = [
+            EntityBuilder.prepare_collection_command(
+                type_name=type_name,
+                entity_id=entity_id,
+                field=field,
+                item_ids=[result.file.id for result in chunk if result.file is not None],
+                operation=CollectionOperation.ADD,
+            ).model_dump()
+            for chunk in chunks
+        ]
+        try:
+            response = await self._execute_commands(commands)
+        except httpx.HTTPError as error:
+            logger.error(f'Failed to attach files to {entity_id}: {error}')
+            response = str(error)
+
+        outcomes = EntityCommandResult.from_raw_responses([entity_id] * len(chunks), response)
+        for chunk, outcome in zip(chunks, outcomes, strict=True):
+            for result in chunk:
+                result.success = outcome.success
+                result.error = None if outcome.success else f'Failed to attach file: {outcome.error}'
+
+        attached = sum(result.success for result in results)
+        logger.info(f'Attached {attached} of {len(paths)} files to {entity_id}')
+        return results
+
     async def download_file(
             self,
             secret: str,
             destination: str | Path | None = None
     ) -> bytes:
         try:
-            response = await self.client.get(f'/api/files/{secret}')
+            response = await self._request(self.client.get, f'/api/files/{secret}')
             logger.info(f'Downloaded file with secret {secret}')
 
             if response.status_code != 200:
@@ -468,6 +1473,159 @@ class FiberyService:
             logger.error(f'Failed to download file: {error}')
             raise FiberyError(f'Failed to download file: {error}') from error
 
+    @staticmethod
+    def _partial_state(marker: Path) -> dict[str, Any]:
+        try:
+            return cast('dict[str, Any]', json.loads(marker.read_text()))
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _validator(response: httpx.Response) -> str | None:
+        # Weak ETags cannot be used with If-Range
+        etag: str | None = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        last_modified: str | None = response.headers.get('Last-Modified')
+        return last_modified
+
+    @staticmethod
+    def _range_start(response: httpx.Response) -> int | None:
+        unit, _, byte_range = response.headers.get('Content-Range', '').partition(' ')
+        start, _, _ = byte_range.partition('-')
+        return int(start) if unit == 'bytes' and start.isdigit() else None
+
+    async def stream_download(
+            self,
+            secret: str,
+            destination: str | Path,
+            expected_size: int | None = None,
+            expected_sha256: str | None = None,
+    ) -> DownloadResult:
+        path = Path(destination)
+        partial = path.with_name(f'{path.name}.part')
+        # Records which secret and remote version the .part file holds
+        marker = path.with_name(f'{path.name}.part.json')
+        url = f'/api/files/{secret}'
+        started = time.perf_counter()
+        retry_started = time.monotonic()
+        digest = hashlib.sha256()
+        offset = 0
+        validator: str | None = None
+
+        # A .part file left by an earlier call is resumed only if it belongs to this secret and
+        # the server can confirm it still serves the same version
+        if partial.exists():
+            state = self._partial_state(marker)
+            if state.get('secret') == secret and state.get('validator'):
+                validator = state['validator']
+                offset = partial.stat().st_size
+                with partial.open('rb') as existing:
+                    for block in iter(lambda: existing.read(1024 * 1024), b''):
+                        digest.update(block)
+            else:
+                partial.unlink()
+        resumed = 0
+        attempt = 0
+        while True:
+            attempt += 1
+            headers: dict[str, str] = {}
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+                if validator:
+                    headers['If-Range'] = validator
+            try:
+                response = await self._request(self._open_stream, url, method='GET', headers=headers)
+                try:
+                    if response.status_code == 416 and offset:
+                        # The partial file does not match the remote file, start over
+                        offset, digest, validator = 0, hashlib.sha256(), None
+                        partial.unlink()
+                        continue
+                    if response.status_code not in (200, 206):
+                        await response.aread()
+                        raise FiberyError(f'Download failed with status {response.status_code}: {response.text}')
+                    if response.status_code == 206 and self._range_start(response) != offset:
+                        if not offset:
+                            raise FiberyError(f'Unexpected partial response for {secret}')
+                        logger.warning(f'Range for {secret} does not start at byte {offset}, starting over')
+                        offset, digest, validator = 0, hashlib.sha256(), None
+                        partial.unlink()
+                        continue
+                    if response.status_code == 200 and offset:
+                        # Range was ignored or If-Range did not match, the full body follows
+                        offset, digest = 0, hashlib.sha256()
+                    elif offset:
+                        resumed += 1
+
+                    validator = self._validator(response)
+                    marker.write_text(json.dumps({'secret': secret, 'validator': validator}))
+                    with partial.open('ab' if offset else 'wb') as output:
+                        # Chunks are written as they arrive so an interruption keeps every byte read
+                        async for chunk in response.aiter_bytes():
+                            output.write(chunk)
+                            digest.update(chunk)
+                            offset += len(chunk)
+                finally:
+                    await response.aclose()
+            except httpx.TransportError as error:
+                if not await self._wait_for_retry(url, attempt, retry_started, error):
+                    raise FiberyError(f'Failed to download file {secret}: {error}') from error
+                continue
+            except httpx.HTTPError as error:
+                raise FiberyError(f'Failed to download file {secret}: {error}') from error
+            break
+
+        marker.unlink(missing_ok=True)
+        sha256 = digest.hexdigest()
+        if expected_size is not None and offset != expected_size:
+            partial.unlink()
+            raise FiberyError(f'Downloaded {offset} bytes of {secret}, expected {expected_size}')
+        if expected_sha256 is not None and sha256 != expected_sha256.lower():
+            partial.unlink()
+            raise FiberyError(f'SHA-256 mismatch for {secret}: got {sha256}, expected {expected_sha256}')
+
+        partial.replace(path)
+        logger.info(f'Saved file {secret} to {path} ({offset} bytes)')
+        return DownloadResult(
+            secret=secret,
+            path=str(path),
+            success=True,
+            size=offset,
+            sha256=sha256,
+            resumed=resumed,
+            duration=time.perf_counter() - started,
+        )
+
+    async def download_files(
+            self,
+            destinations: Mapping[str, str | Path],
+            concurrency: int = 4,
+    ) -> list[DownloadResult]:
+        if concurrency < 1:
+            raise ValueError(f'Concurrency must be positive, got {concurrency}')
+
+        pending = iter(destinations.items())
+        results: dict[str, DownloadResult] = {}
+
+        async def worker() -> None:
+            for secret, destination in pending:
+                started = time.perf_counter()
+                try:
+                    results[secret] = await self.stream_download(secret, destination)
+                except Exception as error:
+                    logger.error(f'Failed to download file {secret}: {error}')
+                    results[secret] = DownloadResult(
+                        secret=secret,
+                        path=str(destination),
+                        success=False,
+                        error=str(error),
+                        duration=time.perf_counter() - started,
+                    )
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(destinations)))))
+        return [results[secret] for secret in destinations]
+
     async def attach_files(
             self,
             type_name: str,
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RateLimiter:
+    def __init__(
+            self,
+            rate: float | None,
+            burst: int = 1,
+            min_rate: float = 0.1,
+            backoff_factor: float = 0.5,
+            recovery_step: float = 0.05,
+    ) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError(f'Rate must be positive or None, got {rate}')
+        if burst < 1:
+            raise ValueError(f'Burst must be at least 1, got {burst}')
+
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.throttled_count = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        if time.monotonic() < self._blocked_until:
+            return 0.0
+        if self.rate is None:
+            return float('inf')
+        self._refill()
+        return self._tokens
+
+    @property
+    def blocked_for(self) -> float:
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    async def wait_for_pause(self) -> None:
+        while (blocked_for := self.blocked_for) > 0:
+            await asyncio.sleep(blocked_for)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                blocked_for = self.blocked_for
+                if blocked_for > 0:
+                    await asyncio.sleep(blocked_for)
+                    continue
+
+                if self.rate is None:
+                    return
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_throttled(self, retry_after: float | None = None) -> None:
+        self.throttled_count += 1
+        if self.rate is None:
+            # No rate to lower, but the server's pause still applies
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            return
+
+        self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+        self._refill()
+        self._tokens = 0.0
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+    def on_success(self) -> None:
+        if self.rate is None or self.max_rate is None or self.rate >= self.max_rate:
+            return
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery_step)
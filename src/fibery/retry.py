@@ -0,0 +1,68 @@
+import random
+from collections.abc import Sequence
+from enum import Enum
+from typing import Any
+
+import httpx
+from pydantic import BaseModel, ConfigDict
+
+
+class CommandKind(str, Enum):
+    IDEMPOTENT = 'idempotent'
+    ID_STAMPED = 'id-stamped'
+    UNSAFE = 'unsafe'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+IDEMPOTENT_COMMANDS = frozenset({
+    'fibery.entity/query',
+    'fibery.entity/update',
+    'fibery.entity/delete',
+    'fibery.entity/add-collection-items',
+    'fibery.entity/remove-collection-items',
+    'fibery.schema/query',
+})
+
+
+class RetryPolicy(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    max_elapsed: float = 120.0
+    jitter: float = 1.0
+    retry_statuses: frozenset[int] = frozenset({500, 502, 503, 504})
+    idempotent_commands: frozenset[str] = IDEMPOTENT_COMMANDS
+
+    def classify_command(self, command: dict[str, Any]) -> CommandKind:
+        name = command.get('command')
+        if name in self.idempotent_commands:
+            return CommandKind.IDEMPOTENT
+        if name == 'fibery.entity/create' and command.get('args', {}).get('entity', {}).get('fibery/id'):
+            return CommandKind.ID_STAMPED
+        return CommandKind.UNSAFE
+
+    def classify_batch(self, commands: Sequence[dict[str, Any]]) -> CommandKind:
+        kinds = {self.classify_command(command) for command in commands}
+        if CommandKind.UNSAFE in kinds:
+            return CommandKind.UNSAFE
+        if CommandKind.ID_STAMPED in kinds:
+            return CommandKind.ID_STAMPED
+        return CommandKind.IDEMPOTENT
+
+    def backoff(self, attempt: int) -> float:
+        delay: float = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
+    def should_retry(self, attempt: int, elapsed: float) -> bool:
+        return attempt < self.max_attempts and elapsed < self.max_elapsed
+
+    def is_retryable_response(self, response: httpx.Response) -> bool:
+        return response.status_code in self.retry_statuses
+
+    @staticmethod
+    def is_retryable_error(error: Exception) -> bool:
+        return isinstance(error, httpx.TransportError)
@@ -0,0 +1,143 @@
+import codecs
+import json
+from enum import Enum
+from typing import Any
+
+from .fibery_models import FiberyError
+
+WHITESPACE = ' \t\r\n'
+VALUE_END = ',]}' + WHITESPACE
+
+_INCOMPLETE = object()
+
+
+class _State(Enum):
+    START = 'start'
+    OBJECT_START = 'object-start'
+    KEY = 'key'
+    COLON = 'colon'
+    VALUE = 'value'
+    AFTER_VALUE = 'after-value'
+    ITEM = 'item'
+    AFTER_ITEM = 'after-item'
+    DONE = 'done'
+
+
+class CommandResultParser:
+    """Yields items of the first command's ``result`` array as soon as each one is complete."""
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._state = _State.START
+        self._key: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return bool(self.fields.get('success'))
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list[Any]:
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(b'', final=True)
+        self._pos = 0
+        items = self._parse(final=True)
+        if self._state is not _State.DONE:
+            raise FiberyError('Unexpected end of response stream')
+        return items
+
+    def _skip_whitespace(self) -> str | None:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else None
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char != expected:
+            raise FiberyError(f'Unexpected character {char!r} in response stream, expected {expected!r}')
+        self._pos += 1
+
+    def _decode_value(self, final: bool) -> Any:
+        # A value cut by the chunk boundary fails to decode and is retried on the next feed
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError as error:
+            if final:
+                raise FiberyError(f'Malformed response stream: {error}') from error
+            return _INCOMPLETE
+
+        # Numbers and literals may continue in the next chunk
+        scalar = self._buffer[self._pos] not in '[{"'
+        if scalar and not final and (end == len(self._buffer) or self._buffer[end] not in VALUE_END):
+            return _INCOMPLETE
+
+        self._pos = end
+        return value
+
+    def _parse(self, final: bool) -> list[Any]:
+        items: list[Any] = []
+        while self._state is not _State.DONE:
+            char = self._skip_whitespace()
+            if char is None:
+                break
+
+            if self._state is _State.START:
+                self._expect(char, '[')
+                self._state = _State.OBJECT_START
+            elif self._state is _State.OBJECT_START:
+                self._expect(char, '{')
+                self._state = _State.KEY
+            elif self._state is _State.KEY:
+                if char == '}':
+                    self._pos += 1
+                    self._state = _State.DONE
+                    continue
+                key = self._decode_value(final)
+                if key is _INCOMPLETE:
+                    break
+                self._key = key
+                self._state = _State.COLON
+            elif self._state is _State.COLON:
+                self._expect(char, ':')
+                self._state = _State.VALUE
+            elif self._state is _State.VALUE:
+                if self._key == 'result' and char == '[':
+                    self._pos += 1
+                    self._state = _State.ITEM
+                    continue
+                value = self._decode_value(final)
+                if value is _INCOMPLETE:
+                    break
+                self.fields[str(self._key)] = value
+                self._state = _State.AFTER_VALUE
+            elif self._state is _State.AFTER_VALUE:
+                if char == ',':
+                    self._pos += 1
+                    self._state = _State.KEY
+                else:
+                    self._expect(char, '}')
+                    self._state = _State.DONE
+            elif self._state is _State.ITEM:
+                if char == ']':
+                    self._pos += 1
+                    self._state = _State.AFTER_VALUE
+                    continue
+                item = self._decode_value(final)
+                if item is _INCOMPLETE:
+                    break
+                items.append(item)
+                self._state = _State.AFTER_ITEM
+            elif self._state is _State.AFTER_ITEM:
+                if char == ',':
+                    self._pos += 1
+                    self._state = _State.ITEM
+                else:
+                    self._expect(char, ']')
+                    self._state = _State.AFTER_VALUE
+        return items
+
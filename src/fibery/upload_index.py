@@ -0,0 +1,66 @@
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from .fibery_models import FileUploadResponse
+
+FILE_FIELDS = ('fibery/id', 'fibery/name', 'fibery/content-type', 'fibery/secret')
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open('rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class UploadIndex:
+    """Maps the SHA-256 of uploaded file content to the Fibery file it was stored as."""
+
+    def __init__(self, path: str | Path = ':memory:') -> None:
+        self.path = str(path)
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS uploads ('
+            'sha256 TEXT PRIMARY KEY, '
+            'file_id TEXT NOT NULL, '
+            'name TEXT NOT NULL, '
+            'content_type TEXT NOT NULL, '
+            'secret TEXT NOT NULL)'
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> 'UploadIndex':
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute('SELECT COUNT(*) FROM uploads').fetchone()
+        return int(count)
+
+    def get(self, sha256: str) -> FileUploadResponse | None:
+        row = self._connection.execute(
+            'SELECT file_id, name, content_type, secret FROM uploads WHERE sha256 = ?',
+            (sha256,),
+        ).fetchone()
+        if row is None:
+            return None
+        return FileUploadResponse.model_validate(dict(zip(FILE_FIELDS, row, strict=True)))
+
+    def put(self, sha256: str, file: FileUploadResponse) -> None:
+        self._connection.execute(
+            'INSERT OR REPLACE INTO uploads (sha256, file_id, name, content_type, secret) VALUES (?, ?, ?, ?, ?)',
+            (sha256, file.id, file.name, file.content_type, file.secret),
+        )
+        self._connection.commit()
+
+    def discard(self, sha256: str) -> None:
+        self._connection.execute('DELETE FROM uploads WHERE sha256 = ?', (sha256,))
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
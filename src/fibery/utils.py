@@ -1,4 +1,8 @@
+from collections.abc import Iterator, Sequence
 from enum import Enum
+from typing import TypeVar
+
+T = TypeVar('T')
 
 
 class DocumentFormat(str, Enum):
@@ -10,6 +14,35 @@ class DocumentFormat(str, Enum):
         return self.value
 
 
+class PaginationMode(str, Enum):
+    OFFSET = 'offset'
+    KEYSET = 'keyset'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class ResultMode(str, Enum):
+    VALIDATE = 'validate'
+    LAZY = 'lazy'
+    RAW = 'raw'
+    TRUSTED = 'trusted'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Aggregate(str, Enum):
+    COUNT = 'q/count'
+    SUM = 'q/sum'
+    AVG = 'q/avg'
+    MIN = 'q/min'
+    MAX = 'q/max'
+
+    def __str__(self) -> str:
+        return self.value
+
+
 class CollectionOperation(str, Enum):
     ADD = 'add'
     REMOVE = 'remove'
@@ -24,3 +57,10 @@ class CollectionOperation(str, Enum):
             CollectionOperation.REMOVE: 'fibery.entity/remove-collection-items'
         }
         return command_map[self]
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    if size < 1:
+        raise ValueError(f'Chunk size must be positive, got {size}')
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -1,10 +1,12 @@
 from typing import ClassVar
 from unittest.mock import Mock
 
+import httpx
 import pytest
 
-from src import FiberyService
 from src.fibery.entity_model import FiberyBaseModel
+from src.fibery.fibery_service import FiberyService
+from src.fibery.rate_limiter import RateLimiter
 from src.fibery.utils import DocumentFormat
 
 
@@ -28,10 +30,31 @@ class AsyncMock(Mock):
 
 
 @pytest.fixture
-def service(self, mock_client):
-    service = FiberyService(token='test_token', account='test_account')
-    service.client = mock_client
-    return service
+def make_service(mock_client):
+    # The shared limiter would otherwise pace every mocked request
+    def make(handler=None, **options):
+        service = FiberyService(**{
+            'token': 'test_token',
+            'account': 'test_account',
+            'rate_limiter': RateLimiter(rate=None),
+            **options
+        })
+        if handler is None:
+            service.client = mock_client
+        else:
+            service.client = httpx.AsyncClient(
+                base_url=service.config.base_url,
+                headers=service.config.headers,
+                transport=httpx.MockTransport(handler),
+            )
+        return service
+
+    return make
+
+
+@pytest.fixture
+def service(make_service):
+    return make_service()
 
 
 @pytest.fixture
@@ -0,0 +1,206 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from src import TTLCache
+from tests.conftest import FiberyModel
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+
+        cache.set('c', 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert cache.evictions == 1
+
+    def test_expires_entries(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set('a', 1)
+
+        assert cache.get('a') == 1
+        clock.now = 10
+
+        assert cache.get('a') is None
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_rate == 0.5
+
+    def test_discard_if(self):
+        cache = TTLCache()
+        cache.set(('A', 1), 1)
+        cache.set(('B', 2), 2)
+
+        assert cache.discard_if(lambda key: key[0] == 'A') == 1
+        assert len(cache) == 1
+
+    def test_rejects_invalid_size(self):
+        with pytest.raises(ValueError, match='Cache size'):
+            TTLCache(maxsize=0)
+
+
+class TestDocumentSecretCache:
+    @pytest.fixture
+    def service(self, make_service):
+        return make_service(document_secret_cache=TTLCache(maxsize=100, ttl=60))
+
+    @pytest.mark.asyncio
+    async def test_get_document_secret_hits_cache(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.json.return_value = [{'success': True, 'result': [{'description': {'secret': 'test_secret'}}]}]
+        mock_client.post.return_value = mock_response
+
+        first = await service.get_document_secret('TestType', 'test_id', 'description')
+        second = await service.get_document_secret('TestType', 'test_id', 'description')
+
+        assert first == second == 'test_secret'
+        mock_client.post.assert_called_once()
+        assert service.document_secret_cache.hits == 1
+        assert service.document_secret_cache.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_document_edit_skips_secret_lookup(self, service, mock_client):
+        secrets_response = Mock()
+        secrets_response.json.return_value = [{'success': True, 'result': [
+            {'fibery/id': 'a', 'TestType/description': {'secret': 'a-desc'}},
+        ]}]
+        put_response = Mock()
+        put_response.json.return_value = {'success': True}
+        mock_client.post.return_value = secrets_response
+        mock_client.put.return_value = put_response
+        content = FiberyModel(name='Test', description='Description').get_rich_text_content()
+
+        await service._update_documents('TestType', {'a': content})
+        await service._update_documents('TestType', {'a': content})
+
+        mock_client.post.assert_called_once()
+        assert mock_client.put.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_write_drops_cached_secret(self, service, mock_client):
+        service.document_secret_cache.set(('TestType', 'a', 'TestType/description'), 'stale')
+        put_response = Mock()
+        put_response.json.return_value = ['unexpected']
+        mock_client.put.return_value = put_response
+        content = FiberyModel(name='Test', description='Description').get_rich_text_content()
+
+        errors = await service._update_documents('TestType', {'a': content})
+
+        assert 'TestType/description' in errors['a']
+        assert len(service.document_secret_cache) == 0
+
+
+class TestQueryCache:
+    @pytest.fixture
+    def service(self, make_service):
+        return make_service(query_cache=TTLCache(maxsize=100, ttl=60))
+
+    @pytest.fixture
+    def responses(self, mock_client):
+        def respond(url, json):
+            response = Mock()
+            if json[0]['command'] == 'fibery.entity/query':
+                response.json.return_value = [{'success': True, 'result': [
+                    {'TestType/name': 'Test', 'TestType/description': 'Description'},
+                ]}]
+            else:
+                response.json.return_value = [{'success': True, 'result': {}}]
+            return response
+
+        mock_client.post.side_effect = respond
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures('responses')
+    async def test_repeated_query_is_served_from_cache(self, service, mock_client):
+        fields = ['TestType/name', 'TestType/description']
+
+        first = await service.get_entities('TestType', fields, FiberyModel)
+        second = await service.get_entities('TestType', fields, FiberyModel)
+
+        assert second is first
+        mock_client.post.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures('responses')
+    async def test_write_invalidates_only_its_type(self, service, mock_client):
+        fields = ['TestType/name', 'TestType/description']
+        await service.get_entities('TestType', fields, FiberyModel)
+        await service.get_entities('OtherType', fields, FiberyModel)
+
+        await service.update_entity('TestType', 'test_id', {'TestType/name': 'New'})
+        await service.get_entities('TestType', fields, FiberyModel)
+        await service.get_entities('OtherType', fields, FiberyModel)
+
+        assert mock_client.post.call_count == 4
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures('responses')
+    async def test_write_to_related_type_invalidates_nested_select(self, service, mock_client):
+        fields = ['TestType/name', 'TestType/description', {'TestType/Owner': {'q/select': ['user/name']}}]
+        await service.get_entities('TestType', fields, FiberyModel)
+
+        await service.update_entity('fibery/user', 'user_id', {'user/name': 'New'})
+        await service.get_entities('TestType', fields, FiberyModel)
+
+        assert mock_client.post.call_count == 3
+
+
+class TestQueryCoalescing:
+    @pytest.fixture
+    def service(self, make_service):
+        return make_service(coalesce_queries=True)
+
+    @pytest.mark.asyncio
+    async def test_identical_queries_share_one_request(self, service, mock_client):
+        async def post(url, json):
+            await asyncio.sleep(0.01)
+            response = Mock()
+            response.json.return_value = [{'success': True, 'result': [
+                {'TestType/name': 'Test', 'TestType/description': 'Description'},
+            ]}]
+            return response
+
+        mock_client.post = Mock(side_effect=post)
+        fields = ['TestType/name', 'TestType/description']
+
+        responses = await asyncio.gather(*(service.get_entities('TestType', fields, FiberyModel) for _ in range(5)))
+        await service.get_entities('TestType', fields, FiberyModel)
+
+        assert all(response.items[0].name == 'Test' for response in responses)
+        assert mock_client.post.call_count == 2
+        assert not service._in_flight_queries
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_request(self, service, mock_client):
+        async def post(url, json):
+            await asyncio.sleep(0.02)
+            response = Mock()
+            response.json.return_value = [{'success': True, 'result': []}]
+            return response
+
+        mock_client.post = Mock(side_effect=post)
+        fields = ['TestType/name']
+        first = asyncio.create_task(service.get_entities('TestType', fields, FiberyModel))
+        second = asyncio.create_task(service.get_entities('TestType', fields, FiberyModel))
+        await asyncio.sleep(0.005)
+
+        first.cancel()
+        response = await second
+
+        assert response.total == 0
+        mock_client.post.assert_called_once()
@@ -0,0 +1,83 @@
+import asyncio
+from unittest.mock import Mock
+
+import httpx
+import pytest
+
+from src.fibery.dispatcher import CommandDispatcher
+from tests.conftest import FiberyModel
+
+
+def echo(url, json):
+    response = Mock()
+    response.json.return_value = [
+        {'success': True, 'result': {'fibery/id': command['args'].get('entity', {}).get('fibery/id')}}
+        for command in json
+    ]
+    return response
+
+
+class TestCommandDispatcher:
+    @pytest.fixture
+    def service(self, make_service):
+        return make_service(batch_window=0.01, max_batch_size=3)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_commands_share_one_request(self, service, mock_client):
+        mock_client.post.side_effect = echo
+
+        responses = await asyncio.gather(
+            service.update_entity('TestType', 'a', {'TestType/name': 'A'}),
+            service.update_entity('TestType', 'b', {'TestType/name': 'B'}),
+        )
+
+        mock_client.post.assert_called_once()
+        assert len(mock_client.post.call_args[1]['json']) == 2
+        assert [response.result['fibery/id'] for response in responses] == ['a', 'b']
+
+    @pytest.mark.asyncio
+    async def test_size_cap_splits_batches(self, service, mock_client):
+        mock_client.post.side_effect = echo
+
+        await asyncio.gather(*(
+            service.update_entity('TestType', str(index), {'TestType/name': 'A'}) for index in range(5)
+        ))
+
+        assert [len(call[1]['json']) for call in mock_client.post.call_args_list] == [3, 2]
+        assert service.dispatcher.batches_sent == 2
+
+    @pytest.mark.asyncio
+    async def test_queries_and_updates_batch_together(self, service, mock_client):
+        def respond(url, json):
+            response = Mock()
+            response.json.return_value = [
+                {'success': True, 'result': [{'TestType/name': 'Test', 'TestType/description': 'Test'}]}
+                if command['command'] == 'fibery.entity/query' else {'success': True, 'result': {}}
+                for command in json
+            ]
+            return response
+
+        mock_client.post.side_effect = respond
+
+        query, update = await asyncio.gather(
+            service.get_entities('TestType', ['TestType/name', 'TestType/description'], FiberyModel),
+            service.update_entity('TestType', 'a', {'TestType/name': 'A'}),
+        )
+
+        mock_client.post.assert_called_once()
+        assert query.items[0].name == 'Test'
+        assert update.success is True
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self, mock_client):
+        mock_client.post.side_effect = httpx.HTTPError('Connection error')
+        dispatcher = CommandDispatcher(mock_client.post, window=0)
+
+        results = await asyncio.gather(
+            dispatcher.submit({'command': 'fibery.entity/query'}),
+            dispatcher.submit({'command': 'fibery.entity/query'}),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, httpx.HTTPError) for result in results)
+        mock_client.post.assert_called_once()
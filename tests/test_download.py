@@ -0,0 +1,149 @@
+import hashlib
+import json
+
+import httpx
+import pytest
+
+from src.fibery.fibery_models import FiberyError
+from src.fibery.retry import RetryPolicy
+
+CONTENT = bytes(range(256)) * 40
+ETAG = '"v1"'
+
+
+class FlakyStream(httpx.AsyncByteStream):
+    def __init__(self, body, fail_after=None):
+        self.body = body
+        self.fail_after = fail_after
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), 1024):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise httpx.ReadError('connection dropped')
+            yield self.body[start:start + 1024]
+
+
+class FileServer:
+    def __init__(self, fail_first_after=None, honour_range=True, range_shift=0):
+        self.fail_first_after = fail_first_after
+        self.honour_range = honour_range
+        self.range_shift = range_shift
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        fail_after = self.fail_first_after if len(self.requests) == 1 else None
+        header = request.headers.get('Range')
+        if header and self.honour_range and request.headers.get('If-Range', ETAG) == ETAG:
+            start = int(header.removeprefix('bytes=').rstrip('-')) + self.range_shift
+            return httpx.Response(
+                206,
+                headers={'ETag': ETAG, 'Content-Range': f'bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}'},
+                stream=FlakyStream(CONTENT[start:], fail_after),
+            )
+        return httpx.Response(200, headers={'ETag': ETAG}, stream=FlakyStream(CONTENT, fail_after))
+
+
+class TestStreamDownload:
+    @pytest.fixture
+    def make_service(self, make_service):
+        return lambda server: make_service(server, retry_policy=RetryPolicy(base_delay=0.001))
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_interruption(self, make_service, tmp_path):
+        server = FileServer(fail_first_after=3072)
+        service = make_service(server)
+        destination = tmp_path / 'scan.bin'
+
+        result = await service.stream_download(
+            'secret',
+            destination,
+            expected_size=len(CONTENT),
+            expected_sha256=hashlib.sha256(CONTENT).hexdigest(),
+        )
+
+        assert destination.read_bytes() == CONTENT
+        assert result.resumed == 1
+        assert server.requests[1].headers['Range'] == 'bytes=3072-'
+        assert not (tmp_path / 'scan.bin.part').exists()
+
+    @pytest.mark.asyncio
+    async def test_resumes_partial_file_of_same_secret(self, make_service, tmp_path):
+        server = FileServer()
+        service = make_service(server)
+        destination = tmp_path / 'scan.bin'
+        (tmp_path / 'scan.bin.part').write_bytes(CONTENT[:2048])
+        (tmp_path / 'scan.bin.part.json').write_text(json.dumps({'secret': 'secret', 'validator': ETAG}))
+
+        result = await service.stream_download('secret', destination)
+
+        assert destination.read_bytes() == CONTENT
+        assert result.resumed == 1
+        assert server.requests[0].headers['If-Range'] == ETAG
+        assert not (tmp_path / 'scan.bin.part.json').exists()
+
+    @pytest.mark.asyncio
+    async def test_discards_partial_file_of_other_secret(self, make_service, tmp_path):
+        server = FileServer()
+        service = make_service(server)
+        destination = tmp_path / 'scan.bin'
+        (tmp_path / 'scan.bin.part').write_bytes(b'other file')
+        (tmp_path / 'scan.bin.part.json').write_text(json.dumps({'secret': 'other', 'validator': ETAG}))
+
+        result = await service.stream_download('secret', destination)
+
+        assert destination.read_bytes() == CONTENT
+        assert result.resumed == 0
+        assert 'Range' not in server.requests[0].headers
+
+    @pytest.mark.asyncio
+    async def test_restarts_when_content_range_does_not_match(self, make_service, tmp_path):
+        server = FileServer(fail_first_after=3072, range_shift=1024)
+        service = make_service(server)
+        destination = tmp_path / 'scan.bin'
+
+        await service.stream_download('secret', destination)
+
+        assert destination.read_bytes() == CONTENT
+        assert 'Range' not in server.requests[2].headers
+
+    @pytest.mark.asyncio
+    async def test_restarts_when_range_is_ignored(self, make_service, tmp_path):
+        server = FileServer(fail_first_after=3072, honour_range=False)
+        service = make_service(server)
+        destination = tmp_path / 'scan.bin'
+
+        result = await service.stream_download('secret', destination)
+
+        assert destination.read_bytes() == CONTENT
+        assert result.sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_hash_mismatch_discards_file(self, make_service, tmp_path):
+        service = make_service(FileServer())
+        destination = tmp_path / 'scan.bin'
+
+        with pytest.raises(FiberyError, match='SHA-256 mismatch'):
+            await service.stream_download('secret', destination, expected_sha256='0' * 64)
+
+        assert not destination.exists()
+        assert not (tmp_path / 'scan.bin.part').exists()
+
+    @pytest.mark.asyncio
+    async def test_download_files_reports_each_secret(self, make_service, tmp_path):
+        def server(request):
+            if request.url.path.endswith('missing'):
+                return httpx.Response(404, text='not found')
+            return httpx.Response(200, stream=FlakyStream(CONTENT))
+
+        service = make_service(server)
+        destinations = {f'secret-{index}': tmp_path / f'file-{index}.bin' for index in range(4)}
+        destinations['missing'] = tmp_path / 'missing.bin'
+
+        results = await service.download_files(destinations, concurrency=2)
+
+        assert [result.secret for result in results] == list(destinations)
+        assert all(result.success for result in results[:4])
+        assert results[4].success is False
+        assert '404' in results[4].error
+        assert (tmp_path / 'file-3.bin').read_bytes() == CONTENT
@@ -1,27 +1,20 @@
+import asyncio
+import time
 from pathlib import Path
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import Mock
 
+import httpx
 import pytest
 
-from src import FiberyService
+from src.fibery.fibery_service import FiberyService
 
 
 class TestFiberyServiceUploadFile:
-    @pytest.fixture
-    def service(self, mock_client):
-        service = FiberyService(token='test_token', account='test_account')
-        service.client = mock_client
-        return service
-
     @pytest.mark.asyncio
-    @patch('httpx.AsyncClient')
-    async def test_upload_file_success(self, mock_async_client_class, service, mock_client, tmp_path):
+    async def test_upload_file_success(self, service, mock_client, tmp_path):
         test_file = tmp_path / 'test.txt'
         test_file.write_text('test content')
 
-        mock_async_client_instance = AsyncMock()
-        mock_async_client_class.return_value.__aenter__.return_value = mock_async_client_instance
-
         mock_response = Mock()
         mock_response.text = 'response text'
         mock_response.json.return_value = {
@@ -30,9 +23,8 @@ class TestFiberyServiceUploadFile:
             'fibery/content-type': 'text/plain',
             'fibery/secret': 'abc123'
         }
-        mock_async_client_instance.post.return_value = mock_response
+        mock_client.post.return_value = mock_response
 
-        mock_client.base_url = 'https://test_account.fibery.io'
         service.get_headers = Mock(return_value={
             'Authorization': 'Bearer test',
             'X-Client': 'Unofficial JS'
@@ -40,9 +32,10 @@ class TestFiberyServiceUploadFile:
 
         result = await service.upload_file(test_file)
 
-        mock_async_client_instance.post.assert_called_once()
-        call_args = mock_async_client_instance.post.call_args
+        mock_client.post.assert_called_once()
+        call_args = mock_client.post.call_args
 
+        assert call_args[0][0] == '/api/files'
         assert call_args[1]['headers'] == {
             'Authorization': 'Bearer test',
             'X-Client': 'Unofficial JS'
@@ -56,14 +49,10 @@ class TestFiberyServiceUploadFile:
         assert result.secret == 'abc123'
 
     @pytest.mark.asyncio
-    @patch('httpx.AsyncClient')
-    async def test_upload_file_with_path_object(self, mock_async_client_class, service, mock_client, tmp_path):
+    async def test_upload_file_with_path_object(self, service, mock_client, tmp_path):
         test_file = Path(tmp_path) / 'test.txt'
         test_file.write_text('test content')
 
-        mock_async_client_instance = AsyncMock()
-        mock_async_client_class.return_value.__aenter__.return_value = mock_async_client_instance
-
         mock_response = Mock()
         mock_response.json.return_value = {
             'fibery/id': '123',
@@ -71,11 +60,168 @@ class TestFiberyServiceUploadFile:
             'fibery/content-type': 'text/plain',
             'fibery/secret': 'abc123'
         }
-        mock_async_client_instance.post.return_value = mock_response
+        mock_client.post.return_value = mock_response
 
-        mock_client.base_url = 'https://test_account.fibery.io'
         mock_client.headers = {'Authorization': 'Bearer test', 'X-Client': 'Unofficial JS'}
 
         await service.upload_file(test_file)
 
-        mock_async_client_instance.post.assert_called_once()
+        mock_client.post.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_upload_from_url_uses_service_client(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'fibery/id': '123',
+            'fibery/name': 'image.png',
+            'fibery/content-type': 'image/png',
+            'fibery/secret': 'abc123'
+        }
+        mock_client.post.return_value = mock_response
+        mock_client.headers = {'Authorization': 'Bearer test'}
+
+        result = await service.upload_from_url('https://example.com/image.png', name='image.png')
+
+        assert result.secret == 'abc123'
+        assert mock_client.post.call_args[0][0] == '/api/files/from-url'
+        assert mock_client.post.call_args[1]['json']['url'] == 'https://example.com/image.png'
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_multipart_upload_gets_multipart_content_type(self, make_service, tmp_path):
+        captured = []
+
+        def handler(request):
+            captured.append(request)
+            return httpx.Response(200, json={
+                'fibery/id': '123',
+                'fibery/name': 'test.txt',
+                'fibery/content-type': 'text/plain',
+                'fibery/secret': 'abc123'
+            })
+
+        service = make_service(handler, max_connections=5)
+        test_file = tmp_path / 'test.txt'
+        test_file.write_text('test content')
+
+        async with service:
+            await service.upload_file(test_file)
+
+        assert captured[0].url == 'https://test_account.fibery.io/api/files'
+        assert captured[0].headers['Content-Type'].startswith('multipart/form-data')
+        assert captured[0].headers['Authorization'] == 'Token test_token'
+
+    @pytest.mark.asyncio
+    async def test_warm_up_opens_connections_concurrently(self):
+        connections = 0
+        in_flight = 0
+        max_in_flight = 0
+
+        async def handle(reader, writer):
+            nonlocal connections, in_flight, max_in_flight
+            connections += 1
+            while await reader.readuntil(b'\r\n\r\n'):
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.05)
+                in_flight -= 1
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n')
+                await writer.drain()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        # The default limiter only lets a burst of 3 through at once
+        service = FiberyService(token='test_token', account='test_account')
+        service.client = httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}')
+        try:
+            opened = await service.warm_up(6)
+        finally:
+            await service.client.aclose()
+            server.close()
+
+        assert opened == 6
+        assert connections == 6
+        assert max_in_flight == 6
+
+    @pytest.mark.asyncio
+    async def test_warm_up_waits_for_server_pause(self, make_service):
+        started = []
+
+        async def handler(request):
+            started.append(time.monotonic())
+            return httpx.Response(429, headers={'Retry-After': '0.05'})
+
+        service = make_service(handler)
+        service.rate_limiter.on_throttled(retry_after=0.05)
+        paused_at = time.monotonic()
+
+        await service.warm_up(2)
+
+        assert min(started) - paused_at >= 0.04
+        assert service.rate_limiter.blocked_for > 0
+
+
+class TestUploadAndAttach:
+    @pytest.fixture
+    def service(self, service, mock_client):
+        mock_client.headers = {'Authorization': 'Bearer test'}
+        return service
+
+    @pytest.mark.asyncio
+    async def test_uploads_concurrently_and_attaches_in_chunks(self, service, mock_client, tmp_path):
+        paths = []
+        for index in range(5):
+            path = tmp_path / f'scan-{index}.txt'
+            path.write_text('scan')
+            paths.append(path)
+        paths.append(tmp_path / 'missing.txt')
+
+        def respond(url, **kwargs):
+            response = Mock()
+            if url == '/api/files':
+                name = kwargs['files']['file'][0]
+                response.json.return_value = {
+                    'fibery/id': f'id-{name}',
+                    'fibery/name': name,
+                    'fibery/content-type': 'text/plain',
+                    'fibery/secret': f'secret-{name}'
+                }
+            else:
+                response.json.return_value = [{'success': True, 'result': None} for _ in kwargs['json']]
+            return response
+
+        mock_client.post.side_effect = respond
+
+        results = await service.upload_and_attach('TestType', 'entity', paths, concurrency=3, chunk_size=2)
+
+        assert [result.index for result in results] == list(range(6))
+        assert all(result.success for result in results[:5])
+        assert results[5].success is False
+        assert 'File not found' in results[5].error
+        commands = mock_client.post.call_args_list[-1][1]['json']
+        assert [len(command['args']['items']) for command in commands] == [2, 2, 1]
+        assert commands[0]['args']['items'][0] == {'fibery/id': 'id-scan-0.txt'}
+        assert mock_client.post.call_count == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_attach_marks_files(self, service, mock_client, tmp_path):
+        path = tmp_path / 'scan.txt'
+        path.write_text('scan')
+        upload_response = Mock()
+        upload_response.json.return_value = {
+            'fibery/id': 'id',
+            'fibery/name': 'scan.txt',
+            'fibery/content-type': 'text/plain',
+            'fibery/secret': 'secret'
+        }
+        attach_response = Mock()
+        attach_response.json.return_value = [{'success': False, 'result': 'no such field'}]
+        mock_client.post.side_effect = [upload_response, attach_response]
+
+        results = await service.upload_and_attach('TestType', 'entity', [path])
+
+        assert results[0].success is False
+        assert results[0].file.id == 'id'
+        assert 'no such field' in results[0].error
@@ -0,0 +1,179 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from src import PaginationMode
+from tests.conftest import FiberyModel
+
+
+def make_rows(start, count):
+    return [
+        {
+            'fibery/id': f'id-{i}',
+            'fibery/creation-date': f'2024-01-{i + 1:02d}',
+            'TestType/name': f'Test {i}',
+            'TestType/description': 'D',
+        }
+        for i in range(start, start + count)
+    ]
+
+
+class TestPagination:
+    @staticmethod
+    def serve(mock_client, total):
+        def respond(url, json):
+            query = json[0]['args']['query']
+            offset = query.get('q/offset', 0)
+            if '$cursor_id' in json[0]['args'].get('params', {}):
+                offset = int(json[0]['args']['params']['$cursor_id'].split('-')[1]) + 1
+            response = Mock()
+            response.json.return_value = [{
+                'success': True,
+                'result': make_rows(offset, max(0, min(query['q/limit'], total - offset))),
+            }]
+            return response
+
+        mock_client.post.side_effect = respond
+
+    @pytest.mark.asyncio
+    async def test_iter_entities_offset(self, service, mock_client):
+        self.serve(mock_client, total=5)
+
+        items = [
+            item async for item in service.iter_entities(
+                'TestType', ['TestType/name'], FiberyModel, page_size=2
+            )
+        ]
+
+        assert [item.name for item in items] == [f'Test {i}' for i in range(5)]
+        queries = [call[1]['json'][0]['args']['query'] for call in mock_client.post.call_args_list]
+        assert [query['q/offset'] for query in queries] == [0, 2, 4]
+        assert queries[0]['q/order-by'] == [[['fibery/creation-date'], 'q/asc'], [['fibery/id'], 'q/asc']]
+
+    @pytest.mark.asyncio
+    async def test_iter_entities_offset_rows_without_keyset_fields(self, service, mock_client):
+        def respond(url, json):
+            query = json[0]['args']['query']
+            offset = query['q/offset']
+            response = Mock()
+            response.json.return_value = [{
+                'success': True,
+                'result': [
+                    {key: row[key] for key in ('fibery/id', 'TestType/name', 'TestType/description')}
+                    for row in make_rows(offset, max(0, min(query['q/limit'], 3 - offset)))
+                ],
+            }]
+            return response
+
+        mock_client.post.side_effect = respond
+
+        items = [
+            item async for item in service.iter_entities(
+                'TestType', ['fibery/id', 'TestType/name', 'TestType/description'], FiberyModel, page_size=2
+            )
+        ]
+
+        assert [item.name for item in items] == ['Test 0', 'Test 1', 'Test 2']
+        assert mock_client.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_iter_pages_stops_on_empty_page(self, service, mock_client):
+        self.serve(mock_client, total=4)
+
+        pages = [
+            page async for page in service.iter_pages(
+                'TestType', ['TestType/name'], FiberyModel, page_size=2
+            )
+        ]
+
+        assert [page.total for page in pages] == [2, 2]
+        assert mock_client.post.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_iter_entities_keyset(self, service, mock_client):
+        self.serve(mock_client, total=5)
+
+        items = [
+            item async for item in service.iter_entities(
+                'TestType',
+                ['TestType/name'],
+                FiberyModel,
+                where=['=', ['TestType/description'], '$description'],
+                params={'$description': 'D'},
+                page_size=2,
+                pagination=PaginationMode.KEYSET,
+            )
+        ]
+
+        assert len(items) == 5
+        commands = [call[1]['json'][0] for call in mock_client.post.call_args_list]
+        assert 'fibery/creation-date' in commands[0]['args']['query']['q/select']
+        assert 'q/offset' not in commands[1]['args']['query']
+        assert commands[1]['args']['query']['q/where'][0] == 'and'
+        assert commands[1]['args']['params'] == {
+            '$description': 'D',
+            '$cursor_date': '2024-01-02',
+            '$cursor_id': 'id-1',
+        }
+
+    @pytest.mark.asyncio
+    async def test_keyset_rejects_custom_order(self, service):
+        pages = service.iter_pages(
+            'TestType',
+            ['TestType/name'],
+            FiberyModel,
+            order_by=[[['TestType/name'], 'q/asc']],
+            pagination=PaginationMode.KEYSET,
+        )
+
+        with pytest.raises(ValueError, match='Keyset'):
+            await anext(pages)
+
+    @pytest.mark.asyncio
+    async def test_prefetch_keeps_order_and_stops_after_short_page(self, service):
+        offsets = []
+        in_flight = 0
+        max_in_flight = 0
+
+        async def post(url, json):
+            nonlocal in_flight, max_in_flight
+            query = json[0]['args']['query']
+            offsets.append(query['q/offset'])
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # Later pages finish first to force reordering
+            await asyncio.sleep(0.02 - query['q/offset'] / 1000)
+            in_flight -= 1
+            response = Mock()
+            response.json.return_value = [{
+                'success': True,
+                'result': make_rows(query['q/offset'], max(0, min(2, 7 - query['q/offset']))),
+            }]
+            return response
+
+        service.client = Mock(post=post)
+
+        items = [
+            item async for item in service.iter_entities(
+                'TestType', ['TestType/name'], FiberyModel, page_size=2, prefetch=3
+            )
+        ]
+
+        assert [item.name for item in items] == [f'Test {i}' for i in range(7)]
+        assert max_in_flight == 3
+        assert sorted(offsets)[:4] == [0, 2, 4, 6]
+        assert max(offsets) <= 10
+
+    @pytest.mark.asyncio
+    async def test_prefetch_rejected_for_keyset(self, service):
+        pages = service.iter_pages(
+            'TestType',
+            ['TestType/name'],
+            FiberyModel,
+            pagination=PaginationMode.KEYSET,
+            prefetch=2,
+        )
+
+        with pytest.raises(ValueError, match='prefetch'):
+            await anext(pages)
@@ -0,0 +1,96 @@
+from typing import ClassVar
+from unittest.mock import Mock
+
+import pytest
+from pydantic import Field
+
+from src import FiberyBaseModel
+from src.fibery.builders import QueryBuilder
+from src.fibery.fibery_models import QueryResponse
+from src.fibery.utils import ResultMode
+
+
+class User(FiberyBaseModel):
+    name: str
+
+    FIBERY_FIELD_MAP: ClassVar[dict[str, str]] = {'name': 'user/name'}
+
+
+class Project(FiberyBaseModel):
+    name: str
+    tasks: list['Task'] = Field(default_factory=list)
+
+    FIBERY_FIELD_MAP: ClassVar[dict[str, str]] = {'name': 'Space/Name'}
+    FIBERY_RELATIONS: ClassVar[dict[str, str]] = {'tasks': 'Space/Tasks'}
+
+
+class Task(FiberyBaseModel):
+    name: str
+    project: Project | None = None
+    assignees: list[User] = Field(default_factory=list)
+
+    FIBERY_FIELD_MAP: ClassVar[dict[str, str]] = {'name': 'Space/Name'}
+    FIBERY_RELATIONS: ClassVar[dict[str, str]] = {
+        'project': 'Space/Project',
+        'assignees': 'Space/Assignees',
+    }
+
+
+Project.model_rebuild()
+
+ROW = {
+    'fibery/id': 'task-1',
+    'Space/Name': 'Write docs',
+    'Space/Project': {'fibery/id': 'project-1', 'Space/Name': 'Client'},
+    'Space/Assignees': [{'fibery/id': 'user-1', 'user/name': 'Ann'}],
+}
+
+
+class TestProjection:
+    def test_select_follows_field_map_and_relations(self):
+        assert QueryBuilder.build_select(Task) == [
+            'fibery/id',
+            'Space/Name',
+            {'Space/Project': {'q/select': ['fibery/id', 'Space/Name']}},
+            {'Space/Assignees': {'q/select': ['fibery/id', 'user/name'], 'q/limit': 'q/no-limit'}},
+        ]
+
+    def test_relation_back_to_parent_is_not_selected(self):
+        tasks = QueryBuilder.build_select(Project)[2]['Space/Tasks']
+
+        assert tasks['q/limit'] == 'q/no-limit'
+        assert {'Space/Project': {'q/select': ['fibery/id', 'Space/Name']}} not in tasks['q/select']
+        assert tasks['q/select'][:2] == ['fibery/id', 'Space/Name']
+
+    def test_nested_rows_are_mapped_to_related_models(self):
+        response = QueryResponse([ROW], Task)
+
+        task = response.items[0]
+        assert task.project.fibery_id == 'project-1'
+        assert task.project.name == 'Client'
+        assert task.assignees[0].name == 'Ann'
+
+    def test_trusted_rows_construct_related_models(self):
+        response = QueryResponse([ROW], Task, ResultMode.TRUSTED)
+
+        task = response.items[0]
+        assert task.project.name == 'Client'
+        assert task.project.fibery_id == 'project-1'
+        assert task.assignees[0].name == 'Ann'
+
+    def test_missing_collection_maps_to_empty_list(self):
+        response = QueryResponse([{**ROW, 'Space/Assignees': None}], Task)
+
+        assert response.items[0].assignees == []
+
+    @pytest.mark.asyncio
+    async def test_query_without_fields_projects_model(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.json.return_value = [{'success': True, 'result': [ROW]}]
+        mock_client.post.return_value = mock_response
+
+        response = await service.get_entities('Space/Task', None, Task)
+
+        select = mock_client.post.call_args[1]['json'][0]['args']['query']['q/select']
+        assert select == QueryBuilder.build_select(Task)
+        assert response.items[0].project.name == 'Client'
@@ -0,0 +1,75 @@
+
+import pytest
+from pydantic import ValidationError
+
+from src.fibery.fibery_models import (
+    FiberyError,
+    LazyItems,
+    QueryResponse,
+    reverse_field_map,
+)
+from src.fibery.utils import ResultMode
+from tests.conftest import FiberyModel
+
+ROWS = [
+    {'fibery/id': f'id-{i}', 'TestType/name': f'Test {i}', 'TestType/description': 'D', 'Other/field': 1}
+    for i in range(3)
+]
+
+
+class TestQueryResponse:
+    def test_maps_fields_and_validates_page(self):
+        response = QueryResponse(ROWS, FiberyModel)
+
+        assert response.total == 3
+        assert response.items[1] == FiberyModel(fibery_id='id-1', name='Test 1', description='D')
+
+    def test_reverse_map_is_cached_per_class(self):
+        assert reverse_field_map(FiberyModel) is reverse_field_map(FiberyModel)
+        assert reverse_field_map(FiberyModel)['TestType/name'] == 'name'
+
+    def test_fields_accept_fibery_names(self):
+        item = FiberyModel.model_validate({'fibery/id': 'id-1', 'TestType/name': 'A', 'TestType/description': 'D'})
+
+        assert item == FiberyModel(fibery_id='id-1', name='A', description='D')
+
+    def test_invalid_row_raises(self):
+        rows = [*ROWS, {'TestType/description': 'missing name'}]
+
+        with pytest.raises(ValidationError):
+            QueryResponse(rows, FiberyModel)
+
+    def test_failed_response(self):
+        with pytest.raises(FiberyError, match='Query failed'):
+            QueryResponse.from_raw_response({'success': False, 'error': 'boom'}, FiberyModel)
+
+    def test_lazy_mode_validates_on_access(self, monkeypatch):
+        calls = []
+        original = FiberyModel.model_validate
+
+        def tracking_validate(data):
+            calls.append(data['name'])
+            return original(data)
+
+        monkeypatch.setattr(FiberyModel, 'model_validate', tracking_validate)
+        response = QueryResponse(ROWS, FiberyModel, mode=ResultMode.LAZY)
+
+        assert isinstance(response.items, LazyItems)
+        assert response.total == 3
+        assert calls == []
+        assert response.items[2].name == 'Test 2'
+        assert response.items[2] is response.items[-1]
+        assert calls == ['Test 2']
+        assert [item.fibery_id for item in response.items] == ['id-0', 'id-1', 'id-2']
+
+    def test_raw_mode_returns_mapped_rows(self):
+        response = QueryResponse(ROWS, FiberyModel, mode=ResultMode.RAW)
+
+        assert response.items[0] == {'fibery_id': 'id-0', 'name': 'Test 0', 'description': 'D'}
+        assert response.rows is response.items
+
+    def test_trusted_mode_skips_validation(self):
+        response = QueryResponse([{'fibery/id': 'only-id'}], FiberyModel, mode=ResultMode.TRUSTED)
+
+        assert isinstance(response.items[0], FiberyModel)
+        assert response.items[0].fibery_id == 'only-id'
@@ -0,0 +1,87 @@
+import time
+
+import httpx
+import pytest
+
+from src.fibery.rate_limiter import RateLimiter, parse_retry_after
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_burst_then_throttle(self):
+        limiter = RateLimiter(rate=50, burst=2)
+
+        started = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+
+        assert time.monotonic() - started >= 0.03
+        assert limiter.available < 1
+
+    @pytest.mark.asyncio
+    async def test_unlimited(self):
+        limiter = RateLimiter(rate=None)
+
+        await limiter.acquire()
+
+        assert limiter.available == float('inf')
+
+    @pytest.mark.asyncio
+    async def test_unlimited_honours_retry_after(self):
+        limiter = RateLimiter(rate=None)
+        limiter.on_throttled(retry_after=0.05)
+
+        assert limiter.available == 0
+        started = time.monotonic()
+        await limiter.acquire()
+
+        assert time.monotonic() - started >= 0.04
+        assert limiter.rate is None
+
+    def test_on_throttled_lowers_rate_and_blocks(self):
+        limiter = RateLimiter(rate=4, burst=4)
+
+        limiter.on_throttled(retry_after=2)
+
+        assert limiter.rate == 2
+        assert limiter.available == 0
+        assert 1.5 < limiter.blocked_for <= 2
+        assert limiter.throttled_count == 1
+
+    def test_on_success_recovers_to_max_rate(self):
+        limiter = RateLimiter(rate=4, recovery_step=0.5)
+        limiter.on_throttled(retry_after=0)
+
+        limiter.on_success()
+        limiter.on_success()
+
+        assert limiter.rate == 4
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('3') == 3
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('garbage') is None
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+
+
+class TestServiceThrottling:
+    @pytest.mark.asyncio
+    async def test_retries_after_429(self, make_service):
+        responses = [
+            httpx.Response(429, headers={'Retry-After': '0'}),
+            httpx.Response(200, json={'success': True}),
+        ]
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return responses.pop(0)
+
+        service = make_service(handler, rate_limiter=RateLimiter(rate=1 / 0.32, burst=3))
+
+        result = await service.update_document('secret', 'content')
+
+        assert result is True
+        assert len(requests) == 2
+        assert service.rate_limiter.throttled_count == 1
+        assert service.rate_limiter.rate < service.rate_limiter.max_rate
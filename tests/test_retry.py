@@ -0,0 +1,95 @@
+import httpx
+import pytest
+
+from src.fibery.retry import CommandKind, RetryPolicy
+from tests.conftest import FiberyModel
+
+
+def make_response(payload, status_code=200):
+    return httpx.Response(status_code, json=payload)
+
+
+class TestRetryPolicy:
+    def test_classify_command(self):
+        policy = RetryPolicy()
+
+        assert policy.classify_command({'command': 'fibery.entity/query'}) is CommandKind.IDEMPOTENT
+        assert policy.classify_command({
+            'command': 'fibery.entity/create',
+            'args': {'type': 'TestType', 'entity': {'fibery/id': 'id'}},
+        }) is CommandKind.ID_STAMPED
+        assert policy.classify_command({
+            'command': 'fibery.entity/create',
+            'args': {'type': 'TestType', 'entity': {}},
+        }) is CommandKind.UNSAFE
+        assert policy.classify_batch([
+            {'command': 'fibery.entity/query'},
+            {'command': 'fibery.custom/command'},
+        ]) is CommandKind.UNSAFE
+
+    def test_backoff_is_bounded(self):
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+
+        assert 0 <= policy.backoff(1) <= 1
+        assert 0 <= policy.backoff(10) <= 4
+        assert RetryPolicy(base_delay=1, jitter=0).backoff(3) == 4
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_attempts=3, max_elapsed=10)
+
+        assert policy.should_retry(2, 1)
+        assert not policy.should_retry(3, 1)
+        assert not policy.should_retry(1, 11)
+
+
+class TestServiceRetry:
+    @pytest.fixture
+    def service(self, make_service):
+        return make_service(retry_policy=RetryPolicy(base_delay=0))
+
+    @pytest.mark.asyncio
+    async def test_query_retried_after_network_error(self, service, mock_client):
+        mock_client.post.side_effect = [
+            httpx.ConnectError('reset'),
+            make_response({}, status_code=503),
+            make_response([{'success': True, 'result': [{'TestType/name': 'Test', 'TestType/description': 'D'}]}]),
+        ]
+
+        response = await service.query_entities('TestType', ['TestType/name'], FiberyModel)
+
+        assert response.total == 1
+        assert mock_client.post.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_retried_create_skips_existing_entities(self, service, mock_client):
+        models = [FiberyModel(name=f'Test {i}', description='D') for i in range(2)]
+        sent = []
+
+        def respond(url, json):
+            sent.append(json)
+            if len(sent) == 1:
+                raise httpx.ReadTimeout('timeout')
+            if len(sent) == 2:
+                first_id = sent[0][0]['args']['entity']['fibery/id']
+                return make_response([{'success': True, 'result': [{'fibery/id': first_id}]}])
+            return make_response([{'success': True, 'result': {'fibery/id': 'second'}}])
+
+        mock_client.post.side_effect = respond
+
+        results = await service.create_entities(models, 'TestType')
+
+        assert sent[1][0]['command'] == 'fibery.entity/query'
+        assert len(sent[2]) == 1
+        assert sent[2][0]['args']['entity']['fibery/id'] == sent[0][1]['args']['entity']['fibery/id']
+        assert [result.success for result in results] == [True, True]
+        assert results[0].result == {'fibery/id': sent[0][0]['args']['entity']['fibery/id']}
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, make_service, mock_client):
+        service = make_service(retry_policy=RetryPolicy(base_delay=0, max_attempts=2))
+        mock_client.post.side_effect = httpx.ConnectError('down')
+
+        with pytest.raises(httpx.ConnectError):
+            await service.query_entities('TestType', ['TestType/name'], FiberyModel)
+
+        assert mock_client.post.call_count == 2
@@ -1,25 +1,20 @@
+import asyncio
 from unittest.mock import Mock
 
 import httpx
 import pytest
 
+from src.fibery.builders import EntityBuilder, QueryBuilder
 from src.fibery.fibery_models import (
     FiberyError,
     FiberyUploadError,
     QueryResponse,
 )
-from src.fibery.fibery_service import FiberyService
-from src.fibery.utils import CollectionOperation, DocumentFormat
+from src.fibery.utils import Aggregate, CollectionOperation, DocumentFormat, ResultMode
 from tests.conftest import FiberyModel
 
 
 class TestFiberyService:
-    @pytest.fixture
-    def service(self, mock_client):
-        service = FiberyService(token='test_token', account='test_account')
-        service.client = mock_client
-        return service
-
     @pytest.mark.asyncio
     async def test_get_document_secret(self, service, mock_client):
         mock_response = Mock()
@@ -58,29 +53,28 @@ class TestFiberyService:
 
     @pytest.mark.asyncio
     async def test_upload_entity_success(self, service, mock_client, test_model):
-        first_response = Mock()
-        first_response.json.return_value = [
-            {
-                'success': True,
-                'result': {'fibery/id': '9ebe6ac9-79d3-46dc-b81e-0cca2e6dce32'}
-            }
-        ]
-
-        second_response = Mock()
-        second_response.json.return_value = [
-            {
-                'success': True,
-                'result': [
-                    {'TestType/description': {'secret': 'test_secret'}}
+        def respond(url, json):
+            response = Mock()
+            if json[0]['command'] == 'fibery.entity/create':
+                response.json.return_value = [{'success': True, 'result': json[0]['args']['entity']}]
+            else:
+                # The secrets query selects fibery/id, so each row carries the id it belongs to
+                entity_id = json[0]['args']['params']['$values'][0]
+                response.json.return_value = [
+                    {
+                        'success': True,
+                        'result': [
+                            {'fibery/id': entity_id, 'TestType/description': {'secret': 'test_secret'}}
+                        ]
+                    }
                 ]
-            }
-        ]
+            return response
 
-        third_response = Mock()
-        third_response.json.return_value = {'success': True}
+        document_response = Mock()
+        document_response.json.return_value = {'success': True}
 
-        mock_client.post.side_effect = [first_response, second_response]
-        mock_client.put.return_value = third_response
+        mock_client.post.side_effect = respond
+        mock_client.put.return_value = document_response
 
         await service.upload_entity(test_model, 'TestType')
 
@@ -318,3 +312,338 @@ class TestFiberyService:
                 item_ids=['item1'],
                 operation=CollectionOperation.ADD
             )
+
+    @pytest.mark.asyncio
+    async def test_create_entities_chunks_commands(self, service, mock_client):
+        def respond(url, json):
+            response = Mock()
+            response.json.return_value = [
+                {'success': True, 'result': {'fibery/id': command['args']['entity']['fibery/id']}}
+                for command in json
+            ]
+            return response
+
+        mock_client.post.side_effect = respond
+        models = [FiberyModel(name=f'Test {i}', description='Test') for i in range(5)]
+
+        results = await service.create_entities(models, 'TestType', chunk_size=2)
+
+        assert mock_client.post.call_count == 3
+        assert [len(call[1]['json']) for call in mock_client.post.call_args_list] == [2, 2, 1]
+        assert all(result.success for result in results)
+        sent_ids = [
+            command['args']['entity']['fibery/id']
+            for call in mock_client.post.call_args_list
+            for command in call[1]['json']
+        ]
+        assert [result.entity_id for result in results] == sent_ids
+
+    @pytest.mark.asyncio
+    async def test_create_entities_partial_failure(self, service, mock_client):
+        first_response = Mock()
+        first_response.json.return_value = [
+            {'success': True, 'result': {'fibery/id': 'ok'}},
+            {'success': False, 'result': {'message': 'invalid field'}},
+        ]
+        mock_client.post.side_effect = [first_response, httpx.HTTPError('Connection error')]
+        models = [FiberyModel(name=f'Test {i}', description='Test') for i in range(3)]
+
+        results = await service.create_entities(models, 'TestType', chunk_size=2)
+
+        assert [result.success for result in results] == [True, False, False]
+        assert 'invalid field' in results[1].error
+        assert results[2].error == 'Connection error'
+
+    @pytest.mark.asyncio
+    async def test_upload_concurrent_collects_results(self, service):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def upload_entity(model, type_name):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if model.name == 'Test 2':
+                raise FiberyUploadError('boom')
+            return f'id-{model.name}', {}
+
+        service._upload_entity = upload_entity
+        models = [FiberyModel(name=f'Test {i}', description='Test') for i in range(6)]
+
+        summary = await service.upload_concurrent(models, 'TestType', workers=3)
+
+        assert max_in_flight == 3
+        assert [result.index for result in summary.results] == list(range(6))
+        assert len(summary.succeeded) == 5
+        assert summary.failed[0].index == 2
+        assert summary.failed[0].error == 'boom'
+        assert summary.results[0].entity_id == 'id-Test 0'
+        assert summary.duration > 0
+
+    @pytest.mark.asyncio
+    async def test_get_document_secrets_single_query(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.json.return_value = [{'success': True, 'result': [
+            {'fibery/id': 'a', 'TestType/description': {'secret': 'a-desc'}, 'TestType/notes': {'secret': 'a-notes'}},
+            {'fibery/id': 'b', 'TestType/description': {'secret': 'b-desc'}, 'TestType/notes': None},
+        ]}]
+        mock_client.post.return_value = mock_response
+
+        secrets = await service.get_document_secrets(
+            'TestType', ['a', 'b'], ['TestType/description', 'TestType/notes']
+        )
+
+        assert secrets == {
+            'a': {'TestType/description': 'a-desc', 'TestType/notes': 'a-notes'},
+            'b': {'TestType/description': 'b-desc'},
+        }
+        mock_client.post.assert_called_once()
+        query = mock_client.post.call_args[1]['json'][0]['args']
+        assert query['query']['q/where'] == ['q/in', ['fibery/id'], '$values']
+        assert query['params'] == {'$values': ['a', 'b']}
+        assert query['query']['q/select'][1] == {'TestType/description': ['Collaboration~Documents/secret']}
+
+    @pytest.mark.asyncio
+    async def test_upload_entities_resolves_secrets_once_per_chunk(self, service, mock_client):
+        def respond(url, json):
+            response = Mock()
+            if json[0]['command'] == 'fibery.entity/create':
+                response.json.return_value = [{'success': True, 'result': {}} for _ in json]
+            else:
+                response.json.return_value = [{'success': True, 'result': [
+                    {'fibery/id': entity_id, 'TestType/description': {'secret': f'secret-{entity_id}'}}
+                    for entity_id in json[0]['args']['params']['$values']
+                ]}]
+            return response
+
+        put_response = Mock()
+        put_response.json.return_value = {'success': True}
+        mock_client.post.side_effect = respond
+        mock_client.put.return_value = put_response
+        models = [FiberyModel(name=f'Test {i}', description=f'Description {i}') for i in range(4)]
+
+        results = await service.upload_entities(models, 'TestType')
+
+        assert all(result.success for result in results)
+        assert mock_client.post.call_count == 2
+        assert mock_client.put.call_count == 4
+        secrets = {call[0][0] for call in mock_client.put.call_args_list}
+        assert secrets == {f'/api/documents/secret-{result.entity_id}' for result in results}
+
+    @pytest.mark.asyncio
+    async def test_update_documents_writes_concurrently(self, service, mock_client):
+        service._document_semaphore = asyncio.Semaphore(2)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def put(url, params, json):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = Mock()
+            if url.endswith('secret-c'):
+                response.json.return_value = ['unexpected']
+            else:
+                response.json.return_value = {'success': True}
+            return response
+
+        secrets_response = Mock()
+        secrets_response.json.return_value = [{'success': True, 'result': [
+            {'fibery/id': entity_id, 'TestType/description': {'secret': f'secret-{entity_id}'}}
+            for entity_id in 'abc'
+        ]}]
+        mock_client.post.return_value = secrets_response
+        mock_client.put = put
+        model = FiberyModel(name='Test', description='Description')
+
+        errors = await service._update_documents('TestType', {
+            entity_id: model.get_rich_text_content() for entity_id in 'abcd'
+        })
+
+        assert max_in_flight == 2
+        assert errors == {
+            'c': {'TestType/description': 'Document update was not acknowledged'},
+            'd': {'TestType/description': 'Document not found'},
+        }
+
+    @pytest.mark.asyncio
+    async def test_upload_entities_reports_document_errors(self, service, mock_client):
+        create_response = Mock()
+        create_response.json.return_value = [{'success': True, 'result': {}}]
+        mock_client.post.side_effect = [create_response, httpx.HTTPError('Connection error')]
+        models = [FiberyModel(name='Test', description='Description')]
+
+        results = await service.upload_entities(models, 'TestType')
+
+        assert results[0].success is True
+        assert 'TestType/description' in results[0].document_errors
+        mock_client.put.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_execute_batch_mixes_queries_and_commands(self, service, mock_client, test_model):
+        mock_response = Mock()
+        mock_response.json.return_value = [
+            {'success': True, 'result': [{'TestType/name': 'Test', 'TestType/description': 'Test'}]},
+            {'success': True, 'result': {'fibery/id': 'test_id'}},
+            {'success': False, 'error': 'unknown type'},
+        ]
+        mock_client.post.return_value = mock_response
+        query = QueryBuilder.build_entities_query('TestType', ['TestType/name', 'TestType/description'])
+        _, command = EntityBuilder.prepare_command('TestType', test_model)
+        other = QueryBuilder.build_entities_query('OtherType', ['OtherType/name'])
+
+        results = await service.execute_batch(
+            [(query, FiberyModel), command, (other, FiberyModel)],
+            return_exceptions=True,
+        )
+
+        mock_client.post.assert_called_once()
+        assert len(mock_client.post.call_args[1]['json']) == 3
+        assert isinstance(results[0], QueryResponse)
+        assert results[0].items[0].name == 'Test'
+        assert results[1].success is True
+        assert isinstance(results[2], FiberyError)
+
+    @pytest.mark.asyncio
+    async def test_execute_batch_raises_failed_query(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.json.return_value = [{'success': False, 'error': 'unknown type'}]
+        mock_client.post.return_value = mock_response
+        query = QueryBuilder.build_entities_query('TestType', ['TestType/name'])
+
+        with pytest.raises(FiberyError, match='unknown type'):
+            await service.execute_batch([(query, FiberyModel)])
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_chunks_and_skips_no_ops(self, service, mock_client):
+        def respond(url, json):
+            response = Mock()
+            response.json.return_value = [{'success': True, 'result': command['args']['entity']} for command in json]
+            return response
+
+        mock_client.post.side_effect = respond
+
+        results = await service.bulk_update('TestType', [
+            ('a', {'TestType/name': 'A'}),
+            ('b', {'TestType/name': 'B'}, {'TestType/name': 'B'}),
+            ('c', {'TestType/name': 'C', 'TestType/description': 'New'}, {'TestType/name': 'C'}),
+            ('d', {'TestType/name': 'D'}),
+        ], chunk_size=2)
+
+        assert [result.entity_id for result in results] == ['a', 'b', 'c', 'd']
+        assert all(result.success for result in results)
+        assert results[1].skipped is True
+        assert mock_client.post.call_count == 2
+        first_chunk = mock_client.post.call_args_list[0][1]['json']
+        assert first_chunk[1]['args']['entity'] == {'fibery/id': 'c', 'TestType/description': 'New'}
+
+    @pytest.mark.asyncio
+    async def test_upsert_entities_splits_creates_and_updates(self, service, mock_client):
+        sent = []
+
+        def respond(url, json):
+            sent.append(json)
+            response = Mock()
+            if json[0]['command'] == 'fibery.entity/query':
+                response.json.return_value = [{'success': True, 'result': [
+                    {'fibery/id': 'existing-id', 'TestType/name': 'Known'},
+                ]}]
+            else:
+                response.json.return_value = [{'success': True, 'result': {}} for _ in json]
+            return response
+
+        mock_client.post.side_effect = respond
+        models = [
+            FiberyModel(name='Known', description='Updated'),
+            FiberyModel(name='New', description='Created'),
+        ]
+
+        ids = await service.upsert_entities('TestType', models, key_field='TestType/name')
+
+        assert ids['Known'] == 'existing-id'
+        assert ids['New'] != 'existing-id'
+        assert sent[0][0]['args']['params'] == {'$values': ['Known', 'New']}
+        assert sent[1][0]['command'] == 'fibery.entity/create'
+        assert sent[1][0]['args']['entity']['TestType/name'] == 'New'
+        assert sent[2] == [{
+            'command': 'fibery.entity/update',
+            'args': {'type': 'TestType', 'entity': {'fibery/id': 'existing-id', 'TestType/description': 'Updated'}},
+        }]
+
+    @pytest.mark.asyncio
+    async def test_upsert_entities_rejects_duplicate_keys(self, service):
+        models = [FiberyModel(name='Same', description='A'), FiberyModel(name='Same', description='B')]
+
+        with pytest.raises(ValueError, match='Duplicate'):
+            await service.upsert_entities('TestType', models, key_field='TestType/name')
+
+    @pytest.mark.asyncio
+    async def test_get_entities_by_ids_chunks_concurrently(self, service, mock_client):
+        async def post(url, json):
+            await asyncio.sleep(0.01)
+            response = Mock()
+            response.json.return_value = [{'success': True, 'result': [
+                {'fibery/id': entity_id, 'TestType/name': f'Name {entity_id}', 'TestType/description': 'Test'}
+                for entity_id in json[0]['args']['params']['$values']
+                if entity_id != 'missing'
+            ]}]
+            return response
+
+        mock_client.post = Mock(side_effect=post)
+        ids = ['a', 'b', 'c', 'a', 'missing']
+
+        entities = await service.get_entities_by_ids('TestType', ids, FiberyModel, chunk_size=2)
+
+        assert set(entities) == {'a', 'b', 'c'}
+        assert entities['b'].name == 'Name b'
+        assert mock_client.post.call_count == 2
+        query = mock_client.post.call_args_list[0][1]['json'][0]['args']['query']
+        assert query['q/where'] == ['q/in', ['fibery/id'], '$values']
+        assert 'fibery/id' in query['q/select']
+
+    @pytest.mark.asyncio
+    async def test_get_entities_by_ids_rejects_lazy_and_raw(self, service):
+        for result_mode in (ResultMode.LAZY, ResultMode.RAW):
+            with pytest.raises(ValueError, match='validate and trusted'):
+                await service.get_entities_by_ids('TestType', ['a'], FiberyModel, result_mode=result_mode)
+
+    @pytest.mark.asyncio
+    async def test_count_entities(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.json.return_value = [{'success': True, 'result': [{'count': 42}]}]
+        mock_client.post.return_value = mock_response
+
+        count = await service.count_entities('TestType', where=['=', ['TestType/name'], '$name'], params={'$name': 'A'})
+
+        assert count == 42
+        query = mock_client.post.call_args[1]['json'][0]['args']
+        assert query['query']['q/select'] == {'count': ['q/count', 'fibery/id']}
+        assert query['params'] == {'$name': 'A'}
+
+    @pytest.mark.asyncio
+    async def test_aggregate_entities_grouped(self, service, mock_client):
+        mock_response = Mock()
+        mock_response.json.return_value = [{'success': True, 'result': [
+            {'Team': 'A', 'Total': 10, 'Average': 2.5},
+            {'Team': 'B', 'Total': 4, 'Average': 4},
+        ]}]
+        mock_client.post.return_value = mock_response
+
+        rows = await service.aggregate_entities(
+            'TestType',
+            aggregates={'Total': (Aggregate.SUM, 'TestType/points'), 'Average': (Aggregate.AVG, 'TestType/points')},
+            group_by={'Team': ['TestType/team', 'Teams/name']},
+        )
+
+        assert rows[0] == {'Team': 'A', 'Total': 10, 'Average': 2.5}
+        query = mock_client.post.call_args[1]['json'][0]['args']['query']
+        assert query['q/select'] == {
+            'Team': ['TestType/team', 'Teams/name'],
+            'Total': ['q/sum', 'TestType/points'],
+            'Average': ['q/avg', 'TestType/points'],
+        }
+        assert query['q/group-by'] == [['TestType/team', 'Teams/name']]
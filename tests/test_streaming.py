@@ -0,0 +1,104 @@
+import json
+
+import httpx
+import pytest
+
+from src.fibery.fibery_models import FiberyError
+from src.fibery.streaming import CommandResultParser
+from tests.conftest import FiberyModel
+
+PAYLOAD = [{
+    'success': True,
+    'result': [
+        {'TestType/name': f'Test {i}', 'TestType/description': 'Escaped "quote" \\ ]}', 'n': -1.5e3}
+        for i in range(20)
+    ],
+}]
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, body, size):
+        self.body = body
+        self.size = size
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start:start + self.size]
+
+
+class TestCommandResultParser:
+    @pytest.mark.parametrize('size', [1, 3, 17, 4096])
+    def test_items_are_emitted_incrementally(self, size):
+        body = json.dumps(PAYLOAD, indent=2).encode()
+        parser = CommandResultParser()
+
+        items = []
+        emitted_early = False
+        for start in range(0, len(body), size):
+            items.extend(parser.feed(body[start:start + size]))
+            emitted_early = emitted_early or (0 < len(items) < 20)
+        items.extend(parser.close())
+
+        assert items == PAYLOAD[0]['result']
+        assert parser.success
+        assert emitted_early or size == 4096
+
+    def test_failed_command_keeps_error(self):
+        parser = CommandResultParser()
+
+        items = parser.feed(b'[{"result": {"message": "bad query"}, "success": false}]')
+        parser.close()
+
+        assert items == []
+        assert not parser.success
+        assert parser.fields['result'] == {'message': 'bad query'}
+
+    def test_truncated_stream(self):
+        parser = CommandResultParser()
+        parser.feed(b'[{"success": true, "result": [{"a": 1}')
+
+        with pytest.raises(FiberyError):
+            parser.close()
+
+
+class TestStreamingQueries:
+    @pytest.fixture
+    def make_service(self, make_service):
+        return lambda handler: make_service(handler, stream_queries=True)
+
+    @pytest.mark.asyncio
+    async def test_query_entities_streams(self, make_service):
+        body = json.dumps(PAYLOAD).encode()
+        service = make_service(lambda request: httpx.Response(200, stream=ChunkedStream(body, 7)))
+
+        response = await service.query_entities('TestType', ['TestType/name'], FiberyModel)
+
+        assert response.total == 20
+        assert response.items[3].name == 'Test 3'
+        assert response.items[0].description == 'Escaped "quote" \\ ]}'
+
+    @pytest.mark.asyncio
+    async def test_failed_query_raises(self, make_service):
+        body = json.dumps([{'success': False, 'result': {'message': 'bad'}}]).encode()
+        service = make_service(lambda request: httpx.Response(200, content=body))
+
+        with pytest.raises(FiberyError, match='bad'):
+            await service.get_entities('TestType', ['TestType/name'], FiberyModel)
+
+    @pytest.mark.asyncio
+    async def test_error_status_raises(self, make_service):
+        service = make_service(lambda request: httpx.Response(401, json={'message': 'unauthorized'}))
+
+        with pytest.raises(FiberyError, match='401'):
+            await service.get_entities('TestType', ['TestType/name'], FiberyModel)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_throttle_retries_raise(self, make_service):
+        body = json.dumps({'message': 'slow down'}).encode()
+        service = make_service(
+            lambda request: httpx.Response(429, headers={'Retry-After': '0'}, stream=ChunkedStream(body, 4))
+        )
+        service.max_throttle_retries = 1
+
+        with pytest.raises(FiberyError, match='slow down'):
+            await service.get_entities('TestType', ['TestType/name'], FiberyModel)
@@ -0,0 +1,51 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.fibery.fibery_models import FiberyError, FileUploadResponse
+from src.fibery.upload_index import UploadIndex, file_sha256
+
+FILE = {
+    'fibery/id': '123',
+    'fibery/name': 'scan.pdf',
+    'fibery/content-type': 'application/pdf',
+    'fibery/secret': 'abc123'
+}
+
+
+class TestUploadIndex:
+    def test_persists_between_sessions(self, tmp_path):
+        path = tmp_path / 'uploads.sqlite'
+        with UploadIndex(path) as index:
+            index.put('digest', FileUploadResponse.model_validate(FILE))
+
+        with UploadIndex(path) as index:
+            assert index.get('digest').model_dump(by_alias=True) == FILE
+            assert index.get('other') is None
+            assert len(index) == 1
+
+    @pytest.mark.asyncio
+    async def test_upload_file_reuses_known_content(self, make_service, mock_client, tmp_path):
+        service = make_service(upload_index=UploadIndex())
+        mock_client.headers = {'Authorization': 'Bearer test'}
+        mock_response = Mock()
+        mock_response.json.return_value = FILE
+        mock_client.post.return_value = mock_response
+        first = tmp_path / 'scan.pdf'
+        first.write_bytes(b'%PDF-1.7 scan')
+        copy = tmp_path / 'copy.pdf'
+        copy.write_bytes(b'%PDF-1.7 scan')
+
+        uploaded = await service.upload_file(first)
+        reused = await service.upload_file(copy)
+
+        assert reused == uploaded
+        mock_client.post.assert_called_once()
+        assert service.upload_index.get(file_sha256(copy)).id == '123'
+
+    @pytest.mark.asyncio
+    async def test_unreadable_file_raises_fibery_error(self, make_service, tmp_path):
+        service = make_service(upload_index=UploadIndex())
+
+        with pytest.raises(FiberyError, match='Failed to upload file'):
+            await service.upload_file(tmp_path)